@@ -1,7 +1,26 @@
-from .app import ArxivMonitor
-from .db import Database
-from .rss_monitor import RSSMonitor
-from .paper_processor import PaperProcessor
-from .content_distributor import ContentDistributor
+import importlib
 
-__version__ = "0.1.0" 
\ No newline at end of file
+__version__ = "0.1.0"
+
+# Components are imported on first access so CLI tools only pay for the
+# dependencies (feedparser, Anthropic, Slack SDK) they actually use.
+_LAZY_IMPORTS = {
+    "ArxivMonitor": "app",
+    "Database": "db",
+    "RSSMonitor": "rss_monitor",
+    "PaperProcessor": "paper_processor",
+    "ContentDistributor": "content_distributor",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_LAZY_IMPORTS[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,56 +1,157 @@
 import os
 import logging
-from typing import Dict, List, Optional
-from dotenv import load_dotenv
-import feedparser
-import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
 import re
+import xml.etree.ElementTree as ET
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
 
+from urllib3.util.retry import Retry
+
 from .db import Database
-from .rss_monitor import RSSMonitor
-from .paper_processor import PaperProcessor
-from .content_distributor import ContentDistributor
+from .http_session import make_session
+from .rate_limit import RateLimiter
+
+# Components are imported when first used, so CLI commands that only touch the
+# database don't load feedparser, the Anthropic SDK or the Slack SDK
+if TYPE_CHECKING:
+    from .rss_monitor import RSSMonitor
+    from .paper_processor import PaperProcessor
+    from .content_distributor import ContentDistributor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# New-style ArXiv identifier with an optional version suffix, e.g. 2301.12345v2
+_ARXIV_ID_RE = re.compile(r"(\d{4}\.\d{4,5})(v\d+)?")
+
+# Namespace used by the ArXiv API's Atom responses
+_ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+
+# ArXiv asks API clients to wait 3 seconds between requests
+_ARXIV_LIMITER = RateLimiter(3.0)
+
+class _ArxivRetry(Retry):
+    """Retry policy that never waits less than ArXiv's request spacing.
+
+    urllib3 retries the first failure immediately, and session retries don't
+    pass through _ARXIV_LIMITER.
+    """
+
+    def get_backoff_time(self) -> float:
+        return max(super().get_backoff_time(), _ARXIV_LIMITER.interval)
+
+# Transient ArXiv API failures are retried by the session with jittered
+# exponential backoff, honoring any Retry-After the API sends when throttling
+_ARXIV_RETRY = _ArxivRetry(
+    total=4,
+    backoff_factor=3,
+    backoff_jitter=1.0,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+    respect_retry_after_header=True
+)
+
+@lru_cache(maxsize=None)
+def _load_settings(config_path: str) -> Dict:
+    """Load and parse environment configuration once per config file."""
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv(config_path)
+
+    smtp_settings = None
+    if os.getenv("SMTP_HOST"):
+        smtp_settings = {
+            "host": os.getenv("SMTP_HOST"),
+            "port": int(os.getenv("SMTP_PORT", "587")),
+            "username": os.getenv("SMTP_USERNAME"),
+            "password": os.getenv("SMTP_PASSWORD"),
+            "from_email": os.getenv("SMTP_FROM_EMAIL"),
+            "use_tls": os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+        }
+
+    return {
+        "claude_api_key": os.getenv("CLAUDE_API_KEY"),
+        "slack_token": os.getenv("SLACK_TOKEN"),
+        "smtp_settings": smtp_settings,
+        "processing_workers": int(os.getenv("PROCESSING_WORKERS", "8")),
+        "use_batch_api": os.getenv("USE_BATCH_API", "false").lower() == "true",
+        "stream_min_relevance": int(os.getenv("STREAM_MIN_RELEVANCE")) if os.getenv("STREAM_MIN_RELEVANCE") else None,
+        "claude_requests_per_minute": int(os.getenv("CLAUDE_REQUESTS_PER_MINUTE") or 0) or None
+    }
+
 class ArxivMonitor:
     def __init__(self, config_path: str = ".env"):
-        # Load environment variables
-        load_dotenv(config_path)
+        self.settings = _load_settings(config_path)
         
-        # Initialize database
+        # Initialize database; other components are created on first use
         self.db = Database()
-        
-        # Initialize components
-        self.rss_monitor = RSSMonitor(self.db)
-        self.paper_processor = PaperProcessor(
+
+        # Keep-alive connections to the ArXiv API, shared by the worker threads
+        self.session = make_session(pool_maxsize=20, max_retries=_ARXIV_RETRY)
+
+        self.max_workers = self.settings["processing_workers"]
+
+    # Worker pools are created on first use and reused across process_feeds calls
+    @cached_property
+    def _processing_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="paper-processing")
+
+    @cached_property
+    def _distribution_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="paper-distribution")
+
+    @cached_property
+    def rss_monitor(self) -> "RSSMonitor":
+        from .rss_monitor import RSSMonitor
+        return RSSMonitor(self.db)
+
+    @cached_property
+    def paper_processor(self) -> "PaperProcessor":
+        from .paper_processor import PaperProcessor
+        return PaperProcessor(
             self.db,
-            os.getenv("CLAUDE_API_KEY")
+            self.settings["claude_api_key"],
+            self.settings["stream_min_relevance"],
+            self.settings["claude_requests_per_minute"]
         )
-        
+
+    @cached_property
+    def content_distributor(self) -> "ContentDistributor":
+        from .content_distributor import ContentDistributor
         # Initialize content distributor with optional Slack and SMTP settings
-        slack_token = os.getenv("SLACK_TOKEN")
-        
-        smtp_settings = None
-        if os.getenv("SMTP_HOST"):
-            smtp_settings = {
-                "host": os.getenv("SMTP_HOST"),
-                "port": int(os.getenv("SMTP_PORT", "587")),
-                "username": os.getenv("SMTP_USERNAME"),
-                "password": os.getenv("SMTP_PASSWORD"),
-                "from_email": os.getenv("SMTP_FROM_EMAIL"),
-                "use_tls": os.getenv("SMTP_USE_TLS", "true").lower() == "true"
-            }
-        
-        self.content_distributor = ContentDistributor(
+        return ContentDistributor(
             self.db,
-            slack_token,
-            smtp_settings
+            self.settings["slack_token"],
+            self.settings["smtp_settings"]
         )
 
+    def close(self) -> None:
+        """Shut down the worker pools and close the connections this instance opened.
+
+        Pools are recreated, and connections reopened, if the instance is used again.
+        """
+        for name in ("_processing_pool", "_distribution_pool"):
+            pool = self.__dict__.pop(name, None)
+            if pool is not None:
+                pool.shutdown()
+        if "rss_monitor" in self.__dict__:
+            self.rss_monitor.session.close()
+        if "content_distributor" in self.__dict__:
+            self.content_distributor.close()
+        self.session.close()
+        self.db.close()
+
+    def _submit_papers(self, papers: List[Dict]) -> List[Future]:
+        """Queue papers on the processing pool; each is dominated by Claude API latency."""
+        return [
+            self._processing_pool.submit(self.paper_processor.process_paper, paper_data)
+            for paper_data in papers
+        ]
+
     def process_feeds(
         self,
         feed_urls: Optional[List[str]] = None,
@@ -61,13 +162,37 @@ class ArxivMonitor:
         """Process RSS feeds and distribute relevant papers."""
         processed_papers = []
 
-        # Monitor feeds for new papers
-        new_papers = self.rss_monitor.monitor_feeds(feed_urls)
-        logger.info(f"Found {len(new_papers)} new papers")
+        # Answer the per-entry "already processed?" checks from memory
+        self.db.load_processed_ids()
+
+        results = None
+        if self.settings["use_batch_api"]:
+            # Batch analysis needs every feed's papers up front
+            new_papers = self.rss_monitor.monitor_feeds(feed_urls)
+            logger.info(f"Found {len(new_papers)} new papers")
+
+            # Unattended runs can trade latency for half-price batch analysis
+            if new_papers:
+                try:
+                    results = self.paper_processor.process_papers_batch(new_papers)
+                except Exception as e:
+                    logger.error(f"Batch analysis failed, processing papers individually: {e}")
+            if results is None:
+                futures = self._submit_papers(new_papers)
+        else:
+            # Start on each feed's papers as soon as it arrives, while slower feeds download
+            new_papers = []
+            futures = []
+            for feed_papers in self.rss_monitor.iter_new_entries(feed_urls):
+                new_papers.extend(feed_papers)
+                futures.extend(self._submit_papers(feed_papers))
+            logger.info(f"Found {len(new_papers)} new papers")
 
-        # Process each paper
-        for paper_data in new_papers:
-            processed_paper = self.paper_processor.process_paper(paper_data)
+        if results is None:
+            results = (future.result() for future in as_completed(futures))
+
+        distributions = []
+        for processed_paper in results:
             if not processed_paper:
                 continue
 
@@ -75,73 +200,118 @@ class ArxivMonitor:
 
             # Distribute if relevance meets threshold
             if processed_paper["relevance_score"] >= min_relevance:
-                self.content_distributor.distribute_paper(
+                distributions.append(self._distribution_pool.submit(
+                    self.content_distributor.distribute_paper,
                     processed_paper,
                     slack_channels,
                     email_recipients
-                )
+                ))
+
+        # Feeds with papers that failed to process are downloaded in full next time
+        processed_ids = {paper["arxiv_id"] for paper in processed_papers}
+        self.rss_monitor.save_validators(
+            paper.get("feed_url") for paper in new_papers if paper["arxiv_id"] not in processed_ids
+        )
+
+        # Wait for distribution to finish so errors surface to the caller
+        for future in as_completed(distributions):
+            future.result()
 
         return processed_papers
 
+    def fetch_papers_batch(self, arxiv_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch paper details for several ArXiv IDs with a single API query."""
+        if not arxiv_ids:
+            return {}
+
+        # Fetch paper details from ArXiv API; the session retries transient failures
+        feed_url = (
+            "http://export.arxiv.org/api/query"
+            f"?id_list={','.join(arxiv_ids)}&max_results={len(arxiv_ids)}"
+        )
+
+        try:
+            _ARXIV_LIMITER.acquire()
+            response = self.session.get(feed_url, timeout=(5, 30))
+            response.raise_for_status()
+
+            # The API always returns well-formed Atom, so a plain expat parse is enough
+            entries = ET.fromstring(response.content).findall("atom:entry", _ATOM_NS)
+        except Exception as e:
+            logger.error(f"Failed to fetch paper details for {', '.join(arxiv_ids)}: {e}")
+            return {}
+
+        if not entries:
+            logger.error(f"Could not fetch paper details from ArXiv: {', '.join(arxiv_ids)}")
+            return {}
+
+        papers = {}
+        for entry in entries:
+            # Entry ids look like http://arxiv.org/abs/2301.12345v1
+            entry_url = entry.findtext("atom:id", "", _ATOM_NS)
+            match = _ARXIV_ID_RE.search(entry_url)
+            if match:
+                entry_id = match.group(1)
+            elif "/abs/" in entry_url:
+                entry_id = entry_url.split("/abs/")[-1]
+            else:
+                # Error entries, e.g. for malformed ids
+                continue
+            papers[entry_id] = {
+                "arxiv_id": entry_id,
+                "arxiv_url": f"https://arxiv.org/abs/{entry_id}",
+                "title": " ".join(entry.findtext("atom:title", "", _ATOM_NS).split()),
+                "authors": ", ".join(
+                    author.findtext("atom:name", "", _ATOM_NS)
+                    for author in entry.findall("atom:author", _ATOM_NS)
+                ),
+                "abstract": " ".join(entry.findtext("atom:summary", "", _ATOM_NS).split())
+            }
+        return papers
+
     def process_single_paper(
         self,
         arxiv_url: str,
         force: bool = False,
         distribute: bool = True,
         slack_channels: Optional[List[str]] = None,
-        email_recipients: Optional[List[str]] = None
+        email_recipients: Optional[List[str]] = None,
+        arxiv_id: Optional[str] = None
     ) -> Optional[Dict]:
-        """Process a single paper by its ArXiv URL."""
-        # Extract paper ID and create initial data
-        arxiv_id = self.rss_monitor.extract_arxiv_id(arxiv_url)
+        """Process a single paper by its ArXiv URL, or by its ID when already known."""
+        # Extract paper ID unless the caller already has it
+        if not arxiv_id:
+            arxiv_id = self.rss_monitor.extract_arxiv_id(arxiv_url)
         if not arxiv_id:
             logger.error(f"Invalid ArXiv URL: {arxiv_url}")
             return None
 
+        # Papers are stored and fetched under their unversioned ID, e.g. 2301.12345v2 -> 2301.12345
+        match = _ARXIV_ID_RE.search(arxiv_id)
+        if match:
+            arxiv_id = match.group(1)
+
         # Check if already processed
         if not force and self.db.is_paper_processed(arxiv_id):
             logger.info(f"Paper {arxiv_id} already processed")
             return self.db.get_paper_by_id(arxiv_id)
 
-        # Add delay before making ArXiv API request
-        time.sleep(3)  # 3 second delay to respect rate limits
+        # Fetch paper details from the ArXiv API
+        paper_data = self.fetch_papers_batch([arxiv_id]).get(arxiv_id)
+        if not paper_data:
+            return None
+        paper_data["arxiv_url"] = arxiv_url
 
-        # Fetch paper details from ArXiv RSS feed with retries
-        max_retries = 3
-        base_delay = 3  # seconds
-        feed_url = f"http://export.arxiv.org/api/query?id_list={arxiv_id}"
-        
-        for attempt in range(max_retries):
-            try:
-                time.sleep(base_delay * (2 ** attempt))  # Exponential backoff
-                feed = feedparser.parse(feed_url)
-                
-                if not feed.entries:
-                    logger.error(f"Could not fetch paper details from ArXiv: {arxiv_id}")
-                    continue
-                    
-                entry = feed.entries[0]
-                paper_data = {
-                    "arxiv_id": arxiv_id,
-                    "arxiv_url": arxiv_url,
-                    "title": entry.get('title', '').replace('\n', ' '),
-                    "authors": ', '.join(author.get('name', '') for author in entry.get('authors', [])),
-                    "abstract": entry.get('summary', '').replace('\n', ' ')
-                }
-                break
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed for {arxiv_id}: {e}")
-                if attempt == max_retries - 1:
-                    logger.error(f"Failed to fetch paper details after {max_retries} attempts")
-                    return None
-
-        # Process the paper
-        processed_paper = self.paper_processor.process_paper(paper_data)
+        # Process the paper, streaming the analysis since a caller is waiting on it
+        processed_paper = self.paper_processor.process_paper(paper_data, force=force, stream=True)
         if not processed_paper:
             return None
 
-        # Distribute if requested
-        if distribute:
+        # Distribute if requested, unless the analysis stopped before its sections
+        from .paper_processor import is_complete
+        if distribute and not is_complete(processed_paper):
+            logger.info(f"Not distributing {arxiv_id}: analysis stopped early")
+        elif distribute:
             self.content_distributor.distribute_paper(
                 processed_paper,
                 slack_channels,
@@ -154,17 +324,25 @@ class ArxivMonitor:
         """Check health status of a specific feed."""
         return self.rss_monitor.check_feed_health(feed_url)
 
-    def get_recent_papers(self, days: int) -> List[Dict]:
-        """Get papers processed in the last N days."""
-        with self.db._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT p.*, f.feed_url
-                FROM processed_papers p
-                LEFT JOIN (
-                    SELECT DISTINCT arxiv_id, feed_url
-                    FROM feed_paper_mapping
-                ) f ON p.arxiv_id = f.arxiv_id
-                WHERE p.processed_date >= datetime('now', ?)
-                ORDER BY p.processed_date DESC
-            """, (f"-{days} days",))
-            return [dict(row) for row in cursor.fetchall()] 
\ No newline at end of file
+    def get_recent_papers(
+        self,
+        days: int,
+        min_relevance: Optional[int] = None,
+        max_relevance: Optional[int] = None,
+        keyword: Optional[str] = None,
+        year: Optional[int] = None,
+        with_feed: bool = False,
+        columns: Optional[Sequence[str]] = None,
+        as_dict: bool = True
+    ) -> List[Dict]:
+        """Get papers processed in the last N days, filtered in the database."""
+        return self.db.get_recent_papers(
+            days,
+            min_relevance=min_relevance,
+            max_relevance=max_relevance,
+            keyword=keyword,
+            year=year,
+            with_feed=with_feed,
+            columns=columns,
+            as_dict=as_dict
+        )
@@ -31,6 +31,9 @@ def backup_db(db_path: str) -> str:
 def reset_db(app: ArxivMonitor) -> None:
     """Move the current database to a backup and create a fresh one."""
     db_path = app.db.db_path
+
+    # Close open connections so pending WAL changes are checkpointed into the file
+    app.db.close()
     
     # Backup existing database
     backup_path = backup_db(db_path)
@@ -57,10 +60,13 @@ def main():
     args = parser.parse_args()
     app = ArxivMonitor(args.config)
 
-    if args.reset:
-        reset_db(app)
-    else:
-        parser.print_help()
+    try:
+        if args.reset:
+            reset_db(app)
+        else:
+            parser.print_help()
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
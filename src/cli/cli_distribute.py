@@ -1,27 +1,34 @@
 import argparse
 import logging
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Union
 
 from ..app import ArxivMonitor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of papers distributed at the same time
+MAX_CONCURRENT_DISTRIBUTIONS = 10
+
 def distribute_paper(
     app: ArxivMonitor,
-    arxiv_id: str,
+    paper_or_id: Union[str, Dict],
     slack_only: bool = False,
     email_only: bool = False,
     channel: Optional[str] = None,
     email: Optional[str] = None,
     dry_run: bool = False
 ) -> None:
-    """Distribute a paper to specified channels."""
-    # Get paper data
-    paper = app.db.get_paper_by_id(arxiv_id)
-    if not paper:
-        logger.error(f"Paper {arxiv_id} not found in database")
-        return
+    """Distribute a paper, given as a loaded paper dict or an ArXiv ID, to specified channels."""
+    # Get paper data unless the caller already loaded it
+    if isinstance(paper_or_id, dict):
+        paper = paper_or_id
+    else:
+        paper = app.db.get_paper_by_id(paper_or_id)
+        if not paper:
+            logger.error(f"Paper {paper_or_id} not found in database")
+            return
 
     # Prepare distribution channels
     slack_channels = [channel] if channel else None
@@ -70,16 +77,37 @@ def distribute_recent(
     papers = app.get_recent_papers(days, min_relevance)
     logger.info(f"Found {len(papers)} papers to distribute")
 
-    for paper in papers:
-        distribute_paper(
-            app,
-            paper['arxiv_id'],
-            slack_only,
-            email_only,
-            channel,
-            email,
-            dry_run
-        )
+    if dry_run or len(papers) <= 1:
+        # Keep dry-run output readable by not interleaving papers
+        for paper in papers:
+            distribute_paper(
+                app,
+                paper,
+                slack_only,
+                email_only,
+                channel,
+                email,
+                dry_run
+            )
+        return
+
+    # Slack and SMTP calls are network bound, so send several papers at once
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_DISTRIBUTIONS, len(papers))) as pool:
+        futures = [
+            pool.submit(
+                distribute_paper,
+                app,
+                paper,
+                slack_only,
+                email_only,
+                channel,
+                email,
+                dry_run
+            )
+            for paper in papers
+        ]
+        for future in as_completed(futures):
+            future.result()
 
 def main():
     parser = argparse.ArgumentParser(description="ArXiv Content Distributor")
@@ -176,6 +204,8 @@ def main():
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,6 +1,6 @@
 import argparse
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 from ..app import ArxivMonitor
 
@@ -25,33 +25,51 @@ def process_paper(
     paper = app.process_single_paper(
         paper_url,
         force=force,
-        distribute=not save_only
+        distribute=not save_only,
+        arxiv_id=None if url else arxiv_id
     )
 
     if paper:
-        logger.info("\nPaper processed successfully:")
-        logger.info(f"Title: {paper['title']}")
-        logger.info(f"Authors: {paper['authors']}")
-        logger.info(f"Relevance Score: {paper['relevance_score']}/10")
-        logger.info(f"URL: {paper['arxiv_url']}")
-        logger.info("\nExecutive Summary:")
-        logger.info(paper['summary'])
-        logger.info("\nKey Findings:")
-        logger.info(paper['key_findings'])
-        logger.info("\nPotential Applications for Etsy:")
-        logger.info(paper['etsy_applications'])
+        log_paper(paper)
     else:
         logger.error("Failed to process paper")
 
+def log_paper(paper: Dict) -> None:
+    """Log the details of a processed paper."""
+    logger.info("\nPaper processed successfully:")
+    logger.info(f"Title: {paper['title']}")
+    logger.info(f"Authors: {paper['authors']}")
+    logger.info(f"Relevance Score: {paper['relevance_score']}/10")
+    logger.info(f"URL: {paper['arxiv_url']}")
+    logger.info("\nExecutive Summary:")
+    logger.info(paper['summary'])
+    logger.info("\nKey Findings:")
+    logger.info(paper['key_findings'])
+    logger.info("\nPotential Applications for Etsy:")
+    logger.info(paper['etsy_applications'])
+
 def process_queue(app: ArxivMonitor, limit: int) -> None:
     """Process papers from the unprocessed queue."""
-    # Get recent papers that haven't been processed
-    papers = app.get_recent_papers(days=30)
-    unprocessed = [p for p in papers if not p.get('processed_date')][:limit]
+    # Get papers seen in feeds that haven't been processed
+    arxiv_ids = app.db.get_unprocessed(limit)
+
+    logger.info(f"Processing {len(arxiv_ids)} papers from queue")
+
+    # Fetch details for the whole queue with one ArXiv API request
+    paper_details = app.fetch_papers_batch(arxiv_ids)
+    for arxiv_id in arxiv_ids:
+        paper_data = paper_details.get(arxiv_id)
+        if not paper_data:
+            logger.error(f"Could not fetch paper details from ArXiv: {arxiv_id}")
+            continue
+
+        paper = app.paper_processor.process_paper(paper_data)
+        if not paper:
+            logger.error("Failed to process paper")
+            continue
 
-    logger.info(f"Processing {len(unprocessed)} papers from queue")
-    for paper in unprocessed:
-        process_paper(app, arxiv_id=paper['arxiv_id'])
+        app.content_distributor.distribute_paper(paper)
+        log_paper(paper)
 
 def main():
     parser = argparse.ArgumentParser(description="ArXiv Paper Processor")
@@ -118,6 +136,8 @@ def main():
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
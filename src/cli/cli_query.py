@@ -1,8 +1,6 @@
 import argparse
 import csv
 import logging
-from collections import defaultdict
-from datetime import datetime
 from typing import Dict, List, Optional
 
 from ..app import ArxivMonitor
@@ -10,9 +8,12 @@ from ..app import ArxivMonitor
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns shown by the paper listings below
+LISTING_COLUMNS = ("title", "relevance_score", "arxiv_url", "processed_date")
+
 def show_recent_papers(app: ArxivMonitor, days: int) -> None:
     """Show recent papers with scores."""
-    papers = app.get_recent_papers(days)
+    papers = app.get_recent_papers(days, columns=LISTING_COLUMNS, as_dict=False)
     logger.info(f"\nPapers from the last {days} days:")
     for paper in papers:
         logger.info(
@@ -24,11 +25,13 @@ def show_recent_papers(app: ArxivMonitor, days: int) -> None:
 
 def show_papers_by_relevance(app: ArxivMonitor, min_score: int, max_score: int) -> None:
     """Show papers within relevance score range."""
-    papers = app.get_recent_papers(days=365)  # Get last year's papers
-    filtered_papers = [
-        p for p in papers
-        if min_score <= p['relevance_score'] <= max_score
-    ]
+    filtered_papers = app.get_recent_papers(
+        days=365,  # Get last year's papers
+        min_relevance=min_score,
+        max_relevance=max_score,
+        columns=LISTING_COLUMNS,
+        as_dict=False
+    )
 
     logger.info(f"\nPapers with relevance score {min_score}-{max_score}:")
     for paper in filtered_papers:
@@ -41,17 +44,13 @@ def show_papers_by_relevance(app: ArxivMonitor, min_score: int, max_score: int)
 
 def search_papers(app: ArxivMonitor, keyword: str) -> None:
     """Search papers by keyword."""
-    papers = app.get_recent_papers(days=365)  # Get last year's papers
     keyword = keyword.lower()
-    
-    matching_papers = [
-        p for p in papers
-        if (keyword in p['title'].lower() or
-            keyword in p['abstract'].lower() or
-            keyword in p['summary'].lower() or
-            keyword in p['key_findings'].lower() or
-            keyword in p['etsy_applications'].lower())
-    ]
+    matching_papers = app.get_recent_papers(
+        days=365,  # Get last year's papers
+        keyword=keyword,
+        columns=LISTING_COLUMNS,
+        as_dict=False
+    )
 
     logger.info(f"\nPapers matching '{keyword}':")
     for paper in matching_papers:
@@ -64,14 +63,6 @@ def search_papers(app: ArxivMonitor, keyword: str) -> None:
 
 def export_papers(app: ArxivMonitor, output_file: str, year: Optional[int] = None) -> None:
     """Export papers to CSV file."""
-    papers = app.get_recent_papers(days=365 if year else 3650)
-    
-    if year:
-        papers = [
-            p for p in papers
-            if datetime.strptime(p['processed_date'], '%Y-%m-%d %H:%M:%S').year == year
-        ]
-
     # Define CSV fields
     fields = [
         'arxiv_id', 'title', 'authors', 'relevance_score',
@@ -80,48 +71,39 @@ def export_papers(app: ArxivMonitor, output_file: str, year: Optional[int] = Non
     ]
 
     try:
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fields)
-            writer.writeheader()
-            for paper in papers:
-                # Only write specified fields
-                row = {field: paper.get(field, '') for field in fields}
+        # Large buffer so long text fields are flushed in few writes
+        with open(output_file, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            count = 0
+            # Stream rows from the database already projected to the CSV fields
+            for row in app.db.iter_papers(days=3650, year=year, columns=fields):
                 writer.writerow(row)
+                count += 1
         
-        logger.info(f"Exported {len(papers)} papers to {output_file}")
+        logger.info(f"Exported {count} papers to {output_file}")
 
     except Exception as e:
         logger.error(f"Error exporting to CSV: {e}")
 
 def show_statistics(app: ArxivMonitor, monthly: bool = False) -> None:
     """Show distribution statistics."""
-    papers = app.get_recent_papers(days=365)  # Get last year's papers
+    # Aggregate last year's papers in the database
+    score_dist = app.db.get_score_distribution(days=365)
     
     # Calculate basic stats
-    total_papers = len(papers)
-    avg_score = sum(p['relevance_score'] for p in papers) / total_papers if total_papers else 0
-    
-    # Group by score
-    score_dist = defaultdict(int)
-    for paper in papers:
-        score_dist[paper['relevance_score']] += 1
+    total_papers = sum(score_dist.values())
+    total_score = sum((score or 0) * count for score, count in score_dist.items())
+    avg_score = total_score / total_papers if total_papers else 0
 
     # Group by month if requested
     if monthly:
-        monthly_stats = defaultdict(list)
-        for paper in papers:
-            date = datetime.strptime(paper['processed_date'], '%Y-%m-%d %H:%M:%S')
-            month_key = f"{date.year}-{date.month:02d}"
-            monthly_stats[month_key].append(paper)
-
         logger.info("\nMonthly Statistics:")
-        for month in sorted(monthly_stats.keys()):
-            month_papers = monthly_stats[month]
-            month_avg = sum(p['relevance_score'] for p in month_papers) / len(month_papers)
+        for month_stats in app.db.get_monthly_stats(days=365):
             logger.info(
-                f"\n{month}:\n"
-                f"Papers processed: {len(month_papers)}\n"
-                f"Average relevance: {month_avg:.1f}"
+                f"\n{month_stats['month']}:\n"
+                f"Papers processed: {month_stats['paper_count']}\n"
+                f"Average relevance: {month_stats['avg_relevance'] or 0:.1f}"
             )
 
     # Print overall stats
@@ -130,7 +112,7 @@ def show_statistics(app: ArxivMonitor, monthly: bool = False) -> None:
     logger.info(f"Average relevance score: {avg_score:.1f}")
     logger.info("\nScore Distribution:")
     for score in range(1, 11):
-        count = score_dist[score]
+        count = score_dist.get(score, 0)
         percentage = (count / total_papers * 100) if total_papers else 0
         logger.info(f"Score {score}: {count} papers ({percentage:.1f}%)")
 
@@ -212,6 +194,8 @@ def main():
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
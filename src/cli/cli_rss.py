@@ -1,30 +1,35 @@
 import argparse
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from ..app import ArxivMonitor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def log_processed(papers: List[Dict], source: str = "") -> None:
+    """Log a processing summary and one line per paper as a single record."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    total_tokens = sum(paper.get('token_usage', 0) for paper in papers)
+    lines = [
+        f"Processed {len(papers)} papers{source}",
+        f"Total token usage: {total_tokens} tokens"
+    ]
+    lines.extend(
+        f"Paper: {paper['title']} (Score: {paper['relevance_score']}, Tokens: {paper.get('token_usage', 0)})"
+        for paper in papers
+    )
+    logger.info("\n".join(lines))
+
 def monitor_all(app: ArxivMonitor) -> None:
     """Monitor all configured feeds."""
-    papers = app.process_feeds()
-    total_tokens = sum(paper.get('token_usage', 0) for paper in papers)
-    logger.info(f"Processed {len(papers)} papers")
-    logger.info(f"Total token usage: {total_tokens} tokens")
-    for paper in papers:
-        logger.info(f"Paper: {paper['title']} (Score: {paper['relevance_score']}, Tokens: {paper.get('token_usage', 0)})")
+    log_processed(app.process_feeds())
 
 def monitor_feed(app: ArxivMonitor, feed_url: str) -> None:
     """Monitor a specific feed."""
-    papers = app.process_feeds([feed_url])
-    total_tokens = sum(paper.get('token_usage', 0) for paper in papers)
-    logger.info(f"Processed {len(papers)} papers from {feed_url}")
-    logger.info(f"Total token usage: {total_tokens} tokens")
-    for paper in papers:
-        logger.info(f"Paper: {paper['title']} (Score: {paper['relevance_score']}, Tokens: {paper.get('token_usage', 0)})")
+    log_processed(app.process_feeds([feed_url]), f" from {feed_url}")
 
 def check_health(app: ArxivMonitor, feed_url: Optional[str] = None) -> None:
     """Check feed health status."""
@@ -44,10 +49,11 @@ def check_health(app: ArxivMonitor, feed_url: Optional[str] = None) -> None:
 
 def show_recent(app: ArxivMonitor, days: int, reprocess: bool = False) -> None:
     """Show recent feed activity."""
-    papers = app.get_recent_papers(days)
+    # Rows are only read here, so skip copying each one into a dict
+    papers = app.get_recent_papers(days, as_dict=False)
     
     if reprocess:
-        logger.info(f"Reprocessing {len(papers)} papers...")
+        logger.info("Reprocessing %d papers...", len(papers))
         reprocessed_papers = []
         for paper in papers:
             processed = app.process_single_paper(paper['arxiv_url'], force=True, distribute=False)
@@ -55,73 +61,73 @@ def show_recent(app: ArxivMonitor, days: int, reprocess: bool = False) -> None:
                 reprocessed_papers.append(processed)
         papers = reprocessed_papers
     
-    total_tokens = sum(paper.get('token_usage', 0) for paper in papers)
-    
-    logger.info(f"\nPapers processed in the last {days} days:")
-    logger.info(f"Total papers: {len(papers)}")
-    logger.info(f"Total token usage: {total_tokens} tokens\n")
-    
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    total_tokens = sum(paper['token_usage'] or 0 for paper in papers)
+
+    # Build the whole listing and emit it as one record instead of one per line
+    lines = [
+        f"\nPapers processed in the last {days} days:",
+        f"Total papers: {len(papers)}",
+        f"Total token usage: {total_tokens} tokens\n"
+    ]
     for paper in papers:
-        logger.info("=" * 80)
-        logger.info(f"Title: {paper['title']}")
-        logger.info(f"URL: {paper['arxiv_url']}")
-        logger.info(f"Processed: {paper.get('processed_date', 'Just now')}")
-        logger.info(f"Relevance Score: {paper['relevance_score']}/10")
-        logger.info(f"Token Usage: {paper.get('token_usage', 0)} tokens")
-        logger.info("\nExecutive Summary:")
-        logger.info(paper['summary'])
-        logger.info("\nKey Findings:")
-        logger.info(paper['key_findings'])
-        logger.info("\nPotential Applications for Etsy:")
-        logger.info(paper['etsy_applications'])
-        logger.info("=" * 80 + "\n")
+        lines.extend([
+            "=" * 80,
+            f"Title: {paper['title']}",
+            f"URL: {paper['arxiv_url']}",
+            f"Processed: {paper['processed_date'] or 'Just now'}",
+            f"Relevance Score: {paper['relevance_score']}/10",
+            f"Token Usage: {paper['token_usage'] or 0} tokens",
+            "\nExecutive Summary:",
+            paper['summary'],
+            "\nKey Findings:",
+            paper['key_findings'],
+            "\nPotential Applications for Etsy:",
+            paper['etsy_applications'],
+            "=" * 80 + "\n"
+        ])
+    logger.info("\n".join(lines))
 
 def show_usage_report(app: ArxivMonitor, days: int) -> None:
     """Show usage statistics for the specified time period."""
-    papers = app.get_recent_papers(days)
-    
+    stats = app.db.get_usage_stats(days)
+
     # Calculate date ranges
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
-    
-    # Basic stats
-    total_papers = len(papers)
-    total_tokens = sum(paper.get('token_usage', 0) for paper in papers)
-    
-    # Papers by feed
-    feed_counts = {}
-    for paper in papers:
-        feed_url = paper.get('feed_url', 'unknown')
-        feed_counts[feed_url] = feed_counts.get(feed_url, 0) + 1
-    
-    # Papers by relevance score
-    relevance_counts = {}
-    for paper in papers:
-        score = paper.get('relevance_score', 0)
-        relevance_counts[score] = relevance_counts.get(score, 0) + 1
-    
+
+    # Counts and sums are aggregated in SQL rather than over every paper row
+    total_papers = stats["total_papers"]
+    total_tokens = stats["total_tokens"]
+    feed_counts = stats["by_feed"]
+    relevance_counts = stats["by_score"]
+
     # Average tokens per paper
     avg_tokens = total_tokens / total_papers if total_papers > 0 else 0
-    
+
     # Print report
-    logger.info("\nUsage Report")
-    logger.info("=" * 80)
-    logger.info(f"Time Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-    logger.info(f"Total Papers Processed: {total_papers}")
-    logger.info(f"Total Token Usage: {total_tokens:,} tokens")
-    logger.info(f"Average Tokens per Paper: {avg_tokens:.1f}")
-    
-    logger.info("\nPapers by Feed:")
+    lines = [
+        "\nUsage Report",
+        "=" * 80,
+        f"Time Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}",
+        f"Total Papers Processed: {total_papers}",
+        f"Total Token Usage: {total_tokens:,} tokens",
+        f"Average Tokens per Paper: {avg_tokens:.1f}",
+        "\nPapers by Feed:"
+    ]
     for feed, count in feed_counts.items():
         feed_name = feed.split('/')[-1] if feed != 'unknown' else 'Unknown'
-        logger.info(f"  {feed_name}: {count} papers")
-    
-    logger.info("\nPapers by Relevance Score:")
+        lines.append(f"  {feed_name}: {count} papers")
+
+    lines.append("\nPapers by Relevance Score:")
     for score in sorted(relevance_counts.keys()):
         count = relevance_counts[score]
-        logger.info(f"  Score {score}/10: {count} papers")
-    
-    logger.info("=" * 80)
+        lines.append(f"  Score {score}/10: {count} papers")
+
+    lines.append("=" * 80)
+    logger.info("\n".join(lines))
 
 def main():
     parser = argparse.ArgumentParser(description="ArXiv RSS Monitor")
@@ -184,6 +190,8 @@ def main():
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,8 +1,11 @@
 import logging
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
@@ -11,6 +14,59 @@ from .db import Database
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on Slack channels posted to at once
+MAX_SLACK_WORKERS = 8
+
+# Fields that make up a formatted paper message, in _format_message argument order
+MESSAGE_FIELDS = (
+    "title", "authors", "relevance_score", "arxiv_url",
+    "summary", "key_findings", "etsy_applications"
+)
+
+@lru_cache(maxsize=256)
+def _format_message(
+    format_type: str,
+    title: str,
+    authors: str,
+    relevance_score: int,
+    arxiv_url: str,
+    summary: str,
+    key_findings: str,
+    etsy_applications: str
+) -> str:
+    """Render a paper message; cached on the content so repeat sends reuse the string."""
+    if format_type == "slack":
+        return f"""*New Relevant Research Paper*
+*Title*: {title}
+*Authors*: {authors}
+*Relevance Score*: {relevance_score}/10
+*ArXiv Link*: {arxiv_url}
+
+*Executive Summary*
+{summary}
+
+*Key Findings*
+{key_findings}
+
+*Potential Applications for Etsy*
+{etsy_applications}"""
+    else:  # email
+        return f"""New Relevant Research Paper
+
+Title: {title}
+Authors: {authors}
+Relevance Score: {relevance_score}/10
+ArXiv Link: {arxiv_url}
+
+Executive Summary
+{summary}
+
+Key Findings
+{key_findings}
+
+Potential Applications for Etsy
+{etsy_applications}"""
+
 class ContentDistributor:
     def __init__(
         self,
@@ -21,40 +77,82 @@ class ContentDistributor:
         self.db = db
         self.slack_client = WebClient(token=slack_token) if slack_token else None
         self.smtp_settings = smtp_settings or {}
+        # One SMTP session is kept open and reused across papers
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
 
-    def format_paper_message(self, paper_data: Dict, format_type: str = "slack") -> str:
-        """Format paper data for distribution."""
-        if format_type == "slack":
-            return f"""*New Relevant Research Paper*
-*Title*: {paper_data['title']}
-*Authors*: {paper_data['authors']}
-*Relevance Score*: {paper_data['relevance_score']}/10
-*ArXiv Link*: {paper_data['arxiv_url']}
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the open SMTP session, connecting and logging in if needed.
 
-*Executive Summary*
-{paper_data['summary']}
+        Callers must hold _smtp_lock.
+        """
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                logger.info("SMTP connection went stale, reconnecting")
+                self._close_smtp()
 
-*Key Findings*
-{paper_data['key_findings']}
+        server = smtplib.SMTP(
+            self.smtp_settings["host"],
+            self.smtp_settings["port"]
+        )
+        try:
+            if self.smtp_settings.get("use_tls"):
+                server.starttls()
 
-*Potential Applications for Etsy*
-{paper_data['etsy_applications']}"""
-        else:  # email
-            return f"""New Relevant Research Paper
+            if "username" in self.smtp_settings:
+                server.login(
+                    self.smtp_settings["username"],
+                    self.smtp_settings["password"]
+                )
+        except Exception:
+            server.close()
+            raise
 
-Title: {paper_data['title']}
-Authors: {paper_data['authors']}
-Relevance Score: {paper_data['relevance_score']}/10
-ArXiv Link: {paper_data['arxiv_url']}
+        self._smtp = server
+        return server
 
-Executive Summary
-{paper_data['summary']}
+    def _close_smtp(self) -> None:
+        """Drop the cached SMTP session. Callers must hold _smtp_lock."""
+        server, self._smtp = self._smtp, None
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
 
-Key Findings
-{paper_data['key_findings']}
+    def close(self) -> None:
+        """Close the SMTP session, if one is open."""
+        with self._smtp_lock:
+            self._close_smtp()
 
-Potential Applications for Etsy
-{paper_data['etsy_applications']}"""
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def format_paper_message(self, paper_data: Dict, format_type: str = "slack") -> str:
+        """Format paper data for distribution."""
+        return _format_message(format_type, *(paper_data[field] for field in MESSAGE_FIELDS))
+
+    def _post_slack_message(self, arxiv_id: str, channel: str, message: str) -> Tuple:
+        """Post one Slack message, returning its distribution log row."""
+        try:
+            self.slack_client.chat_postMessage(
+                channel=channel,
+                text=message,
+                unfurl_links=True
+            )
+            logger.info(f"Sent to Slack channel {channel}")
+            return (arxiv_id, f"slack:{channel}", True, None)
+
+        except (SlackApiError, Exception) as e:
+            error_message = f"Failed to send to Slack channel {channel}: {str(e)}"
+            logger.error(error_message)
+            return (arxiv_id, f"slack:{channel}", False, error_message)
 
     def send_slack_message(
         self,
@@ -68,29 +166,17 @@ Potential Applications for Etsy
 
         message = self.format_paper_message(paper_data, "slack")
 
-        for channel in channels:
-            try:
-                response = self.slack_client.chat_postMessage(
-                    channel=channel,
-                    text=message,
-                    unfurl_links=True
-                )
-                self.db.log_distribution(
-                    paper_data["arxiv_id"],
-                    f"slack:{channel}",
-                    True
-                )
-                logger.info(f"Sent to Slack channel {channel}")
+        def post(channel: str) -> Tuple:
+            return self._post_slack_message(paper_data["arxiv_id"], channel, message)
 
-            except (SlackApiError, Exception) as e:
-                error_message = f"Failed to send to Slack channel {channel}: {str(e)}"
-                logger.error(error_message)
-                self.db.log_distribution(
-                    paper_data["arxiv_id"],
-                    f"slack:{channel}",
-                    False,
-                    error_message
-                )
+        if len(channels) <= 1:
+            log_rows = [post(channel) for channel in channels]
+        else:
+            # WebClient is thread-safe, so channels can be posted to in parallel
+            with ThreadPoolExecutor(max_workers=min(MAX_SLACK_WORKERS, len(channels))) as pool:
+                log_rows = list(pool.map(post, channels))
+
+        self.db.log_distribution_batch(log_rows)
 
     def send_email(
         self,
@@ -105,55 +191,60 @@ Potential Applications for Etsy
         message = MIMEMultipart()
         message["Subject"] = f"New Research Paper: {paper_data['title']}"
         message["From"] = self.smtp_settings.get("from_email", "noreply@example.com")
+        # Recipients go in the envelope only, so one DATA transfer serves them all
+        message["To"] = "undisclosed-recipients:;"
 
         body = self.format_paper_message(paper_data, "email")
         message.attach(MIMEText(body, "plain"))
 
+        def failed(error_message: str) -> List[Tuple]:
+            return [
+                (paper_data["arxiv_id"], f"email:{recipient}", False, error_message)
+                for recipient in recipients
+            ]
+
+        with self._smtp_lock:
+            try:
+                server = self._get_smtp()
+            except Exception as e:
+                error_message = f"SMTP connection failed: {str(e)}"
+                logger.error(error_message)
+                self.db.log_distribution_batch(failed(error_message))
+                return
+
+            try:
+                try:
+                    refused = self._send_message(server, message, recipients)
+                except smtplib.SMTPServerDisconnected:
+                    # The reused session was dropped by the server; reconnect once
+                    self._close_smtp()
+                    refused = self._send_message(self._get_smtp(), message, recipients)
+            except Exception as e:
+                error_message = f"Failed to send email: {str(e)}"
+                logger.error(error_message)
+                self.db.log_distribution_batch(failed(error_message))
+                return
+
+        log_rows = []
+        for recipient in recipients:
+            if recipient in refused:
+                code, response = refused[recipient]
+                error_message = f"Failed to send email to {recipient}: {code} {response.decode(errors='replace')}"
+                logger.error(error_message)
+                log_rows.append((paper_data["arxiv_id"], f"email:{recipient}", False, error_message))
+            else:
+                log_rows.append((paper_data["arxiv_id"], f"email:{recipient}", True, None))
+        logger.info(f"Sent email to {len(recipients) - len(refused)} of {len(recipients)} recipients")
+
+        self.db.log_distribution_batch(log_rows)
+
+    @staticmethod
+    def _send_message(server: smtplib.SMTP, message: MIMEMultipart, recipients: List[str]) -> Dict:
+        """Send one message to every recipient, returning the refused recipients."""
         try:
-            with smtplib.SMTP(
-                self.smtp_settings["host"],
-                self.smtp_settings["port"]
-            ) as server:
-                if self.smtp_settings.get("use_tls"):
-                    server.starttls()
-                
-                if "username" in self.smtp_settings:
-                    server.login(
-                        self.smtp_settings["username"],
-                        self.smtp_settings["password"]
-                    )
-
-                for recipient in recipients:
-                    try:
-                        message["To"] = recipient
-                        server.send_message(message)
-                        self.db.log_distribution(
-                            paper_data["arxiv_id"],
-                            f"email:{recipient}",
-                            True
-                        )
-                        logger.info(f"Sent email to {recipient}")
-
-                    except Exception as e:
-                        error_message = f"Failed to send email to {recipient}: {str(e)}"
-                        logger.error(error_message)
-                        self.db.log_distribution(
-                            paper_data["arxiv_id"],
-                            f"email:{recipient}",
-                            False,
-                            error_message
-                        )
-
-        except Exception as e:
-            error_message = f"SMTP connection failed: {str(e)}"
-            logger.error(error_message)
-            for recipient in recipients:
-                self.db.log_distribution(
-                    paper_data["arxiv_id"],
-                    f"email:{recipient}",
-                    False,
-                    error_message
-                )
+            return server.send_message(message, to_addrs=recipients)
+        except smtplib.SMTPRecipientsRefused as e:
+            return e.recipients
 
     def distribute_paper(
         self,
@@ -161,9 +252,20 @@ Potential Applications for Etsy
         slack_channels: Optional[List[str]] = None,
         email_recipients: Optional[List[str]] = None
     ) -> None:
-        """Distribute paper to all configured channels."""
-        if slack_channels:
+        """Distribute paper to all configured channels.
+
+        Slack and email are independent, so when both are configured they are
+        sent concurrently.
+        """
+        if slack_channels and email_recipients:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(self.send_slack_message, paper_data, slack_channels),
+                    pool.submit(self.send_email, paper_data, email_recipients)
+                ]
+                for future in futures:
+                    future.result()
+        elif slack_channels:
             self.send_slack_message(paper_data, slack_channels)
-        
-        if email_recipients:
-            self.send_email(paper_data, email_recipients) 
\ No newline at end of file
+        elif email_recipients:
+            self.send_email(paper_data, email_recipients)
@@ -1,17 +1,95 @@
+import json
 import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns of processed_papers that callers may select by name
+PAPER_COLUMNS = (
+    "arxiv_id", "processed_date", "relevance_score", "title", "authors",
+    "abstract", "summary", "key_findings", "etsy_applications",
+    "arxiv_url", "pdf_path", "token_usage"
+)
+
+def _column_list(columns: Optional[Sequence[str]], prefix: str = "") -> str:
+    """Render a whitelisted processed_papers column list for a SELECT, or * for all."""
+    if columns is None:
+        return f"{prefix}*"
+    unknown = set(columns) - set(PAPER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown paper columns: {', '.join(sorted(unknown))}")
+    return ", ".join(prefix + column for column in columns)
+
+# Seconds a feed_health row is served from memory before re-querying
+_HEALTH_TTL = 1.0
+
+# Bound parameters per statement on SQLite builds before 3.32
+_MAX_VARIABLES = 999
+
+# INSERT ... RETURNING needs SQLite 3.35+
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+
+# Hot statements are kept as constants so every call hands sqlite3 the same
+# string and hits the connection's prepared statement cache
+_SQL_IS_PROCESSED = "SELECT 1 FROM processed_papers WHERE arxiv_id = ?"
+_SQL_PROCESSED_IDS = "SELECT arxiv_id FROM processed_papers"
+_SQL_GET_PAPER = "SELECT * FROM processed_papers WHERE arxiv_id = ?"
+_SQL_GET_PROCESSED_DATE = "SELECT processed_date FROM processed_papers WHERE arxiv_id = ?"
+_SQL_SAVE_PAPER = """
+    INSERT OR REPLACE INTO processed_papers (
+        arxiv_id, processed_date, relevance_score, title, authors,
+        abstract, summary, key_findings, etsy_applications,
+        arxiv_url, pdf_path, token_usage
+    ) VALUES (?, CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_SAVE_PAPER_RETURNING = _SQL_SAVE_PAPER + "RETURNING processed_date"
+_SQL_LOG_DISTRIBUTION = """
+    INSERT INTO distribution_log (
+        arxiv_id, channel, success, error_message
+    ) VALUES (?, ?, ?, ?)
+"""
+_SQL_GET_FEED_HEALTH = "SELECT * FROM feed_health WHERE feed_url = ?"
+_SQL_GET_ANALYSIS = "SELECT analysis FROM analysis_cache WHERE content_hash = ?"
+_SQL_CACHE_ANALYSIS = "INSERT OR REPLACE INTO analysis_cache (content_hash, analysis) VALUES (?, ?)"
+_SQL_GET_FEED_CACHE = "SELECT etag, last_modified, entry_count FROM feed_cache WHERE feed_url = ?"
+_SQL_SAVE_FEED_CACHE = """
+    INSERT OR REPLACE INTO feed_cache (feed_url, etag, last_modified, entry_count)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_UPDATE_FEED_HEALTH = """
+    INSERT INTO feed_health (
+        feed_url, last_successful_fetch, last_entry_count,
+        consecutive_empty_fetches
+    ) VALUES (?1, CURRENT_TIMESTAMP, ?2, CASE WHEN ?2 = 0 THEN 1 ELSE 0 END)
+    ON CONFLICT (feed_url) DO UPDATE SET
+        last_successful_fetch = CURRENT_TIMESTAMP,
+        last_entry_count = excluded.last_entry_count,
+        consecutive_empty_fetches = CASE
+            WHEN excluded.last_entry_count = 0 THEN consecutive_empty_fetches + 1
+            ELSE 0
+        END
+"""
+
 class Database:
     def __init__(self, db_path: str = "./data/arxiv_monitor.db"):
         self.db_path = db_path
+        self.has_fts = False
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection is shared by every thread; the lock serializes its use
+        self._lock = threading.RLock()
+        self._health_cache: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        # IDs of processed papers, once load_processed_ids has been called
+        self._known_ids: Optional[Set[str]] = None
         self._ensure_db_directory()
         self._init_db()
+        self._init_fts()
 
     def _ensure_db_directory(self):
         """Ensure the database directory exists."""
@@ -63,34 +141,213 @@ class Database:
                     FOREIGN KEY (arxiv_id) REFERENCES processed_papers (arxiv_id),
                     FOREIGN KEY (feed_url) REFERENCES feed_health (feed_url)
                 );
+
+                CREATE TABLE IF NOT EXISTS feed_cache (
+                    feed_url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    entry_count INTEGER DEFAULT 0,
+                    updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    content_hash TEXT PRIMARY KEY,
+                    analysis TEXT NOT NULL,
+                    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_papers_date_score
+                    ON processed_papers (processed_date, relevance_score);
+
+                CREATE INDEX IF NOT EXISTS idx_distlog_arxiv
+                    ON distribution_log (arxiv_id);
+
+                CREATE INDEX IF NOT EXISTS idx_feedmap_feed
+                    ON feed_paper_mapping (feed_url);
             """)
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with row factory."""
-        conn = sqlite3.connect(self.db_path)
+    def _init_fts(self):
+        """Initialize the full-text search index over paper text, if FTS5 is available."""
+        with self._get_connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'papers_fts'"
+            ).fetchone() is not None
+
+            try:
+                conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                        arxiv_id UNINDEXED, title, abstract, summary,
+                        key_findings, etsy_applications,
+                        content='processed_papers', content_rowid='rowid'
+                    );
+
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON processed_papers BEGIN
+                        INSERT INTO papers_fts (
+                            rowid, arxiv_id, title, abstract, summary, key_findings, etsy_applications
+                        ) VALUES (
+                            new.rowid, new.arxiv_id, new.title, new.abstract, new.summary,
+                            new.key_findings, new.etsy_applications
+                        );
+                    END;
+
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON processed_papers BEGIN
+                        INSERT INTO papers_fts (
+                            papers_fts, rowid, arxiv_id, title, abstract, summary, key_findings, etsy_applications
+                        ) VALUES (
+                            'delete', old.rowid, old.arxiv_id, old.title, old.abstract, old.summary,
+                            old.key_findings, old.etsy_applications
+                        );
+                    END;
+
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE ON processed_papers BEGIN
+                        INSERT INTO papers_fts (
+                            papers_fts, rowid, arxiv_id, title, abstract, summary, key_findings, etsy_applications
+                        ) VALUES (
+                            'delete', old.rowid, old.arxiv_id, old.title, old.abstract, old.summary,
+                            old.key_findings, old.etsy_applications
+                        );
+                        INSERT INTO papers_fts (
+                            rowid, arxiv_id, title, abstract, summary, key_findings, etsy_applications
+                        ) VALUES (
+                            new.rowid, new.arxiv_id, new.title, new.abstract, new.summary,
+                            new.key_findings, new.etsy_applications
+                        );
+                    END;
+                """)
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Full-text search unavailable, falling back to LIKE queries: {e}")
+                return
+
+            if not exists:
+                # Index papers saved before the search table existed
+                conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+        self.has_fts = True
+
+    @contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Hold the shared connection for a block of work, opening it on first use.
+
+        The connection runs in autocommit mode, so each statement commits on its
+        own unless the block issues an explicit BEGIN/COMMIT.
+        """
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(
+                    self.db_path,
+                    check_same_thread=False,
+                    isolation_level=None,
+                    cached_statements=256
+                )
+                conn.row_factory = sqlite3.Row
+                conn.executescript("""
+                    PRAGMA journal_mode = WAL;
+                    PRAGMA synchronous = NORMAL;
+                    PRAGMA temp_store = MEMORY;
+                    PRAGMA mmap_size = 268435456;
+                    PRAGMA cache_size = -65536;
+                    -- INSERT OR REPLACE must fire the delete trigger that keeps papers_fts in sync
+                    PRAGMA recursive_triggers = ON;
+                """)
+                self._conn = conn
+            yield self._conn
+
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Open a private read-only connection for a long scan, closing it afterwards.
+
+        In WAL mode it reads alongside the shared connection, so a slow or
+        abandoned scan never holds the shared connection's lock.
+        """
+        conn = sqlite3.connect(
+            Path(self.db_path).resolve().as_uri() + "?mode=ro",
+            uri=True,
+            # An abandoned iterator may be closed by whichever thread collects it
+            check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row
-        return conn
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block of statements as one write transaction.
+
+        Nested calls join the outermost transaction, which commits on exit or
+        rolls back if the block raises.
+        """
+        with self._get_connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the shared connection; it is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load_processed_ids(self) -> Set[str]:
+        """Load every processed ArXiv ID into memory for is_paper_processed.
+
+        Until this is called again, lookups are answered from the set, which
+        save_paper keeps current for papers saved through this instance.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            self._known_ids = {row[0] for row in cursor.execute(_SQL_PROCESSED_IDS)}
+            return self._known_ids
+
+    def filter_unprocessed(self, arxiv_ids: Sequence[str]) -> Set[str]:
+        """Return the subset of arxiv_ids that have not been processed, in one lookup."""
+        known_ids = self._known_ids
+        if known_ids is not None:
+            return set(arxiv_ids) - known_ids
+
+        unique_ids = list(set(arxiv_ids))
+        if not unique_ids:
+            return set()
+
+        processed = set()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            # Stay under SQLite's limit on bound parameters per statement
+            for start in range(0, len(unique_ids), _MAX_VARIABLES):
+                chunk = unique_ids[start:start + _MAX_VARIABLES]
+                processed.update(row[0] for row in cursor.execute(
+                    f"SELECT arxiv_id FROM processed_papers WHERE arxiv_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ))
+        return set(unique_ids) - processed
 
     def is_paper_processed(self, arxiv_id: str) -> bool:
         """Check if a paper has already been processed."""
+        known_ids = self._known_ids
+        if known_ids is not None:
+            return arxiv_id in known_ids
+
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT 1 FROM processed_papers WHERE arxiv_id = ?",
-                (arxiv_id,)
-            )
+            cursor = conn.execute(_SQL_IS_PROCESSED, (arxiv_id,))
             return cursor.fetchone() is not None
 
     def save_paper(self, paper_data: Dict) -> Dict:
         """Save processed paper data to the database."""
-        with self._get_connection() as conn:
-            # First save the paper
-            conn.execute("""
-                INSERT OR REPLACE INTO processed_papers (
-                    arxiv_id, processed_date, relevance_score, title, authors,
-                    abstract, summary, key_findings, etsy_applications,
-                    arxiv_url, pdf_path, token_usage
-                ) VALUES (?, CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        with self.transaction() as conn:
+            # Save the paper, reading back the processed_date in the same statement if possible
+            cursor = conn.execute(_SQL_SAVE_PAPER_RETURNING if HAS_RETURNING else _SQL_SAVE_PAPER, (
                 paper_data["arxiv_id"],
                 paper_data.get("relevance_score"),
                 paper_data.get("title"),
@@ -103,76 +360,246 @@ class Database:
                 paper_data.get("pdf_path"),
                 paper_data.get("token_usage", 0)
             ))
-            
-            # Then fetch the saved paper to get the processed_date
-            cursor = conn.execute(
-                "SELECT * FROM processed_papers WHERE arxiv_id = ?",
-                (paper_data["arxiv_id"],)
-            )
-            saved_paper = dict(cursor.fetchone())
-            
-            # Update the paper_data with the processed_date
-            paper_data["processed_date"] = saved_paper["processed_date"]
-            return paper_data
+
+            if not HAS_RETURNING:
+                cursor = conn.execute(_SQL_GET_PROCESSED_DATE, (paper_data["arxiv_id"],))
+            processed_date = cursor.fetchone()[0]
+
+        if self._known_ids is not None:
+            self._known_ids.add(paper_data["arxiv_id"])
+
+        # Update the paper_data with the processed_date
+        paper_data["processed_date"] = processed_date
+        return paper_data
 
     def update_feed_health(self, feed_url: str, entry_count: int) -> None:
         """Update feed health information."""
         with self._get_connection() as conn:
-            # First, get current consecutive_empty_fetches value
-            cursor = conn.execute(
-                "SELECT consecutive_empty_fetches FROM feed_health WHERE feed_url = ?",
-                (feed_url,)
-            )
-            row = cursor.fetchone()
-            current_empty_fetches = row['consecutive_empty_fetches'] if row else 0
-            
-            # Then update or insert
-            conn.execute("""
-                INSERT OR REPLACE INTO feed_health (
-                    feed_url, last_successful_fetch, last_entry_count,
-                    consecutive_empty_fetches
-                ) VALUES (?, CURRENT_TIMESTAMP, ?, ?)
-            """, (
-                feed_url,
-                entry_count,
-                current_empty_fetches + 1 if entry_count == 0 else 0
-            ))
+            self._health_cache.pop(feed_url, None)
+            # Insert or update in one statement, counting consecutive empty fetches
+            conn.execute(_SQL_UPDATE_FEED_HEALTH, (feed_url, entry_count))
 
     def log_distribution(self, arxiv_id: str, channel: str, success: bool, error_message: Optional[str] = None) -> None:
         """Log paper distribution attempt."""
         with self._get_connection() as conn:
-            conn.execute("""
-                INSERT INTO distribution_log (
-                    arxiv_id, channel, success, error_message
-                ) VALUES (?, ?, ?, ?)
-            """, (arxiv_id, channel, success, error_message))
+            conn.execute(_SQL_LOG_DISTRIBUTION, (arxiv_id, channel, success, error_message))
+
+    def log_distribution_batch(self, rows: Sequence[Tuple[str, str, bool, Optional[str]]]) -> None:
+        """Log several distribution attempts as (arxiv_id, channel, success, error_message) rows."""
+        if not rows:
+            return
+        with self.transaction() as conn:
+            conn.executemany(_SQL_LOG_DISTRIBUTION, rows)
+
+    def get_recent_papers(
+        self,
+        days: int = 7,
+        min_relevance: Optional[int] = None,
+        max_relevance: Optional[int] = None,
+        keyword: Optional[str] = None,
+        year: Optional[int] = None,
+        with_feed: bool = False,
+        columns: Optional[Sequence[str]] = None,
+        as_dict: bool = True
+    ) -> List[Union[Dict, sqlite3.Row]]:
+        """Get papers processed in the last N days, optionally filtered.
+
+        With with_feed, each row also carries the feed_url it was found in.
+        columns limits each row to those processed_papers columns. Read-only
+        callers may pass as_dict=False to get sqlite3.Row objects, which
+        support paper["title"] access without copying every column into a dict.
+        """
+        select = _column_list(columns, prefix="p.")
+        conditions = ["p.processed_date >= datetime('now', ?)"]
+        params: List = [f"-{days} days"]
+
+        if min_relevance is not None:
+            conditions.append("p.relevance_score >= ?")
+            params.append(min_relevance)
+
+        if max_relevance is not None:
+            conditions.append("p.relevance_score <= ?")
+            params.append(max_relevance)
+
+        if year is not None:
+            conditions.append("strftime('%Y', p.processed_date) = ?")
+            params.append(str(year))
+
+        search_join = ""
+        if keyword and self.has_fts:
+            # Quote the keyword as a prefix phrase so user input is never parsed as FTS syntax
+            search_join = "JOIN papers_fts ON papers_fts.rowid = p.rowid"
+            conditions.append("papers_fts MATCH ?")
+            params.append('"' + keyword.replace('"', '""') + '"*')
+        elif keyword:
+            # Case-insensitive substring match across the text columns
+            pattern = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            text_columns = ["title", "abstract", "summary", "key_findings", "etsy_applications"]
+            conditions.append("(" + " OR ".join(
+                f"p.{column} LIKE ? ESCAPE '\\'" for column in text_columns
+            ) + ")")
+            params.extend([pattern] * len(text_columns))
+
+        feed_join = ""
+        if with_feed:
+            feed_join = """
+                LEFT JOIN (
+                    SELECT DISTINCT arxiv_id, feed_url
+                    FROM feed_paper_mapping
+                ) f ON p.arxiv_id = f.arxiv_id
+            """
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT {select}{", f.feed_url" if with_feed else ""}
+                FROM processed_papers p
+                {feed_join}
+                {search_join}
+                WHERE {" AND ".join(conditions)}
+                ORDER BY p.processed_date DESC
+            """, params)
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows] if as_dict else rows
+
+    def iter_papers(
+        self,
+        days: int,
+        year: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[Union[Dict, Tuple]]:
+        """Yield papers processed in the last N days one row at a time.
 
-    def get_recent_papers(self, days: int = 7) -> List[Dict]:
-        """Get papers processed in the last N days."""
+        When columns are given, rows are yielded as plain tuples in that order.
+        Rows are read over a separate connection, closed once the iterator is
+        exhausted or closed, so other threads can use the database meanwhile.
+        """
+        query = f"SELECT {_column_list(columns)} FROM processed_papers"
+        query += " WHERE processed_date >= datetime('now', ?)"
+        params: List = [f"-{days} days"]
+
+        if year is not None:
+            query += " AND strftime('%Y', processed_date) = ?"
+            params.append(str(year))
+
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            if columns is not None:
+                cursor.row_factory = None
+            for row in cursor.execute(query + " ORDER BY processed_date DESC", params):
+                yield row if columns is not None else dict(row)
+
+    def get_score_distribution(self, days: int) -> Dict[int, int]:
+        """Count papers per relevance score over the last N days."""
         with self._get_connection() as conn:
             cursor = conn.execute("""
-                SELECT * FROM processed_papers
-                WHERE processed_date >= datetime('now', '-' || ? || ' days')
-                ORDER BY processed_date DESC
-            """, (days,))
+                SELECT relevance_score, COUNT(*) AS paper_count
+                FROM processed_papers
+                WHERE processed_date >= datetime('now', ?)
+                GROUP BY relevance_score
+            """, (f"-{days} days",))
+            return {row["relevance_score"]: row["paper_count"] for row in cursor}
+
+    def get_monthly_stats(self, days: int) -> List[Dict]:
+        """Get paper counts and average relevance per month over the last N days."""
+        with self._get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT strftime('%Y-%m', processed_date) AS month,
+                       COUNT(*) AS paper_count,
+                       AVG(relevance_score) AS avg_relevance
+                FROM processed_papers
+                WHERE processed_date >= datetime('now', ?)
+                GROUP BY month
+                ORDER BY month
+            """, (f"-{days} days",))
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_usage_stats(self, days: int) -> Dict:
+        """Get paper and token totals over the last N days, broken down by feed and score.
+
+        A paper found in several feeds counts once per feed in by_feed; papers
+        never linked to a feed are counted under "unknown".
+        """
+        cutoff = f"-{days} days"
+        with self._get_connection() as conn:
+            totals = conn.execute("""
+                SELECT COUNT(*) AS total_papers,
+                       COALESCE(SUM(token_usage), 0) AS total_tokens
+                FROM processed_papers
+                WHERE processed_date >= datetime('now', ?)
+            """, (cutoff,)).fetchone()
+
+            by_feed = conn.execute("""
+                SELECT COALESCE(m.feed_url, 'unknown') AS feed_url, COUNT(*) AS paper_count
+                FROM processed_papers p
+                LEFT JOIN feed_paper_mapping m ON m.arxiv_id = p.arxiv_id
+                WHERE p.processed_date >= datetime('now', ?)
+                GROUP BY 1
+                ORDER BY paper_count DESC
+            """, (cutoff,))
+
+            stats = dict(totals)
+            stats["by_feed"] = {row["feed_url"]: row["paper_count"] for row in by_feed}
+        stats["by_score"] = self.get_score_distribution(days)
+        return stats
+
+    def get_unprocessed(self, limit: int) -> List[str]:
+        """Get ArXiv IDs seen in feeds that have not been processed yet, oldest first."""
+        with self._get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT m.arxiv_id
+                FROM feed_paper_mapping m
+                LEFT JOIN processed_papers p ON p.arxiv_id = m.arxiv_id
+                WHERE p.arxiv_id IS NULL OR p.processed_date IS NULL
+                GROUP BY m.arxiv_id
+                ORDER BY MIN(m.fetch_date)
+                LIMIT ?
+            """, (limit,))
+            return [row["arxiv_id"] for row in cursor]
+
+    def get_cached_analysis(self, content_hash: str) -> Optional[Dict]:
+        """Get a stored Claude analysis by the hash of the content it was made from."""
+        with self._get_connection() as conn:
+            row = conn.execute(_SQL_GET_ANALYSIS, (content_hash,)).fetchone()
+            return json.loads(row["analysis"]) if row else None
+
+    def cache_analysis(self, content_hash: str, analysis: Dict) -> None:
+        """Store a Claude analysis for reuse on identical content."""
+        with self._get_connection() as conn:
+            conn.execute(_SQL_CACHE_ANALYSIS, (content_hash, json.dumps(analysis)))
+
     def get_paper_by_id(self, arxiv_id: str) -> Optional[Dict]:
         """Get a specific paper by its ArXiv ID."""
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM processed_papers WHERE arxiv_id = ?",
-                (arxiv_id,)
-            )
+            cursor = conn.execute(_SQL_GET_PAPER, (arxiv_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def get_feed_cache(self, feed_url: str) -> Optional[Dict]:
+        """Get the HTTP validators and entry count from a feed's last full download."""
+        with self._get_connection() as conn:
+            row = conn.execute(_SQL_GET_FEED_CACHE, (feed_url,)).fetchone()
+            return dict(row) if row else None
+
+    def save_feed_cache(
+        self,
+        feed_url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        entry_count: int
+    ) -> None:
+        """Store a feed's HTTP validators for conditional requests on the next poll."""
+        with self._get_connection() as conn:
+            conn.execute(_SQL_SAVE_FEED_CACHE, (feed_url, etag, last_modified, entry_count))
+
     def get_feed_health(self, feed_url: str) -> Optional[Dict]:
-        """Get health information for a specific feed."""
+        """Get health information for a specific feed, cached for a short TTL."""
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM feed_health WHERE feed_url = ?",
-                (feed_url,)
-            )
-            row = cursor.fetchone()
-            return dict(row) if row else None 
\ No newline at end of file
+            cached = self._health_cache.get(feed_url)
+            if cached and time.monotonic() - cached[0] < _HEALTH_TTL:
+                health = cached[1]
+            else:
+                cursor = conn.execute(_SQL_GET_FEED_HEALTH, (feed_url,))
+                row = cursor.fetchone()
+                health = dict(row) if row else None
+                self._health_cache[feed_url] = (time.monotonic(), health)
+            return dict(health) if health else None
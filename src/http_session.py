@@ -0,0 +1,12 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Union
+
+def make_session(pool_maxsize: int, max_retries: Union[Retry, int] = 0) -> requests.Session:
+    """Create a session keeping up to pool_maxsize connections alive per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,29 +1,23 @@
 import os
+import hashlib
 import logging
-import requests
-from typing import Dict, Optional
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from anthropic import Anthropic
 
 from .db import Database
+from .rate_limit import RateLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class PaperProcessor:
-    def __init__(self, db: Database, claude_api_key: str):
-        self.db = db
-        self.anthropic = Anthropic(api_key=claude_api_key)
-
-    def assess_relevance(self, title: str, abstract: str) -> Dict:
-        """Use Claude to evaluate paper relevance and generate summary."""
-        try:
-            # Prepare context for Claude
-            context = f"""Title: {title}
+SYSTEM_PROMPT = "You are an expert on AI and ML, and your job is to evaluate the relevance of a research paper to Etsy both in terms of business opportunities and technical advances. You are also an expert in the field of e-commerce and marketplace dynamics."
 
-Abstract: {abstract}
-
-Task: Analyze this research paper and evaluate its relevance to Etsy's business. Consider aspects like:
+TASK_PROMPT = """Task: Analyze the research paper below and evaluate its relevance to Etsy's business. Consider aspects like:
 - E-commerce applications
 - Marketplace dynamics
 - Search and recommendation systems
@@ -37,64 +31,377 @@ Please provide:
 3. Key findings (bullet points)
 4. Potential applications for Etsy (bullet points)"""
 
-            # Get Claude's analysis
-            response = self.anthropic.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=1000,
-                temperature=0,
-                system="You are an expert on AI and ML, and your job is to evaluate the relevance of a research paper to Etsy both in terms of business opportunities and technical advances. You are also an expert in the field of e-commerce and marketplace dynamics.",
-                messages=[{
-                    "role": "user",
-                    "content": context
-                }]
-            )
+# Static prompt blocks, built once and shared by every request; never mutated
+_SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral"}
+}]
+_TASK_BLOCK = {
+    "type": "text",
+    "text": TASK_PROMPT,
+    "cache_control": {"type": "ephemeral"}
+}
 
-            # Parse Claude's response
-            analysis = response.content[0].text
-            
-            # Extract components (this is a simple parsing, could be made more robust)
-            sections = analysis.split('\n\n')
-            
-            # Find relevance score
-            score_section = next(s for s in sections if 'relevance score' in s.lower())
-            relevance_score = int(''.join(filter(str.isdigit, score_section.split('/')[0])))
-            
-            # Extract other sections
-            summary_section = next(s for s in sections if 'executive summary' in s.lower())
-            summary = summary_section.split(':', 1)[1].strip() if ':' in summary_section else summary_section
-            
-            findings_section = next(s for s in sections if 'key findings' in s.lower())
-            findings = findings_section.split(':', 1)[1].strip() if ':' in findings_section else findings_section
-            
-            applications_section = next(s for s in sections if 'applications' in s.lower())
-            applications = applications_section.split(':', 1)[1].strip() if ':' in applications_section else applications_section
-
-            # Get token usage from response
-            token_usage = response.usage.input_tokens + response.usage.output_tokens
-
-            return {
-                "relevance_score": relevance_score,
-                "summary": summary,
-                "key_findings": findings,
-                "etsy_applications": applications,
-                "token_usage": token_usage
-            }
+# Analysis fields stored in the analysis cache; token counts are per call
+CACHED_FIELDS = ("relevance_score", "summary", "key_findings", "etsy_applications")
+
+# Lowercase text identifying each section of Claude's analysis
+SECTION_MARKERS = {
+    "score": "relevance score",
+    "summary": "executive summary",
+    "findings": "key findings",
+    "applications": "applications"
+}
+
+# The first number after the "Relevance score...:" label, e.g. "Relevance score (1-10): 8/10"
+_SCORE_RE = re.compile(r"relevance score[^:\n]*:\D*(\d+)", re.IGNORECASE)
+
+# Batch polling backs off from the caller's interval up to this many seconds,
+# giving up once the provider's 24 hour processing window has passed
+BATCH_MAX_POLL_INTERVAL = 600
+BATCH_TIMEOUT = 24 * 60 * 60
+
+# Analyses kept in memory in front of the database cache
+MEMORY_CACHE_SIZE = 4096
+
+# Stored in place of the sections a streamed analysis stopped before reaching
+STOPPED_EARLY = "Not analyzed: relevance score below the streaming threshold"
+
+# Rough characters per output token, for streams closed before usage is final
+CHARS_PER_TOKEN = 4
+
+def is_complete(paper: Dict) -> bool:
+    """Whether a processed paper has a full analysis, not one stopped early."""
+    return paper.get("summary") != STOPPED_EARLY
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+def _custom_id(arxiv_id: str) -> str:
+    """Batch custom_ids may not contain dots, which new-style ArXiv IDs always have."""
+    return arxiv_id.replace(".", "_")
+
+def _arxiv_id(custom_id: str) -> str:
+    return custom_id.replace("_", ".")
+
+def content_hash(title: str, abstract: str, prompt: str = "") -> str:
+    """Hash paper content so re-posted or re-fetched copies share a cache entry.
+
+    Case and whitespace are ignored; prompt folds the analysis instructions into
+    the key so changing them invalidates earlier analyses.
+    """
+    key = "\x00".join((_normalize(title), _normalize(abstract), prompt))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+class PaperProcessor:
+    def __init__(
+        self,
+        db: Database,
+        claude_api_key: str,
+        min_relevance_score: Optional[int] = None,
+        requests_per_minute: Optional[int] = None
+    ):
+        self.db = db
+        self.anthropic = Anthropic(api_key=claude_api_key)
+        # Spaces out analysis calls shared by all worker threads, keeping under the account's rate limit
+        self._limiter = RateLimiter(60 / requests_per_minute) if requests_per_minute else None
+        # Streamed analyses stop early once the score is known to be below this
+        self.min_relevance_score = min_relevance_score
+        self._memory_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._memory_cache_lock = threading.Lock()
+        self._prompt_fingerprint = hashlib.sha256(
+            repr(self._build_request("", "")).encode("utf-8")
+        ).hexdigest()
+
+    def _build_request(self, title: str, abstract: str) -> Dict:
+        """Build the Messages API parameters for analyzing one paper.
+
+        The system prompt and task rubric are identical for every paper and come
+        first, marked for prompt caching; only the paper block varies.
+        """
+        return {
+            "model": "claude-3-haiku-20240307",
+            "max_tokens": 1000,
+            "temperature": 0,
+            "system": _SYSTEM_BLOCKS,
+            "messages": [{
+                "role": "user",
+                "content": [
+                    _TASK_BLOCK,
+                    {
+                        "type": "text",
+                        "text": f"Title: {title}\n\nAbstract: {abstract}"
+                    }
+                ]
+            }]
+        }
+
+    @staticmethod
+    def _parse_sections(text: str) -> Dict[str, str]:
+        """Split an analysis into its sections in one pass.
+
+        Each field takes the first paragraph mentioning its marker; a missing
+        field raises ValueError.
+        """
+        remaining = dict(SECTION_MARKERS)
+        found = {}
+        for section in text.split('\n\n'):
+            low = section.lower()
+            for field, marker in list(remaining.items()):
+                if marker in low:
+                    found[field] = section
+                    del remaining[field]
+            if not remaining:
+                return found
+        raise ValueError(f"Analysis is missing sections: {', '.join(remaining)}")
+
+    @staticmethod
+    def _section_value(section: str) -> str:
+        """Return the text after a section's label, or the whole section if unlabeled."""
+        _, sep, value = section.partition(':')
+        return value.strip() if sep else section
+
+    def _parse_response(self, response) -> Dict:
+        """Parse Claude's analysis message into paper fields."""
+        # Parse Claude's response
+        analysis = response.content[0].text
+
+        # Extract components (this is a simple parsing, could be made more robust)
+        sections = self._parse_sections(analysis)
+
+        # Find relevance score
+        match = _SCORE_RE.search(sections["score"])
+        if not match:
+            raise ValueError(f"No relevance score in: {sections['score']}")
+        relevance_score = int(match.group(1))
+
+        # Extract other sections
+        summary = self._section_value(sections["summary"])
+        findings = self._section_value(sections["findings"])
+        applications = self._section_value(sections["applications"])
+
+        # Get token usage from response; cached prefix reads are reported separately
+        token_usage = response.usage.input_tokens + response.usage.output_tokens
+        cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", None) or 0
+
+        return {
+            "relevance_score": relevance_score,
+            "summary": summary,
+            "key_findings": findings,
+            "etsy_applications": applications,
+            "token_usage": token_usage,
+            "cache_read_tokens": cache_read_tokens
+        }
+
+    @staticmethod
+    def _error_analysis() -> Dict:
+        """Analysis recorded when Claude's response could not be obtained or parsed."""
+        return {
+            "relevance_score": 0,
+            "summary": "Error analyzing paper",
+            "key_findings": "Error analyzing paper",
+            "etsy_applications": "Error analyzing paper",
+            "token_usage": 0,
+            "cache_read_tokens": 0
+        }
+
+    def _remember(self, key: str, analysis: Dict) -> None:
+        """Keep an analysis in the in-memory LRU, evicting the oldest entry when full."""
+        with self._memory_cache_lock:
+            self._memory_cache[key] = analysis
+            self._memory_cache.move_to_end(key)
+            if len(self._memory_cache) > MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
+
+    def _cached_analysis(self, key: str) -> Optional[Dict]:
+        """Return a stored analysis for this content hash, costing no tokens."""
+        with self._memory_cache_lock:
+            analysis = self._memory_cache.get(key)
+            if analysis is not None:
+                self._memory_cache.move_to_end(key)
+
+        if analysis is None:
+            analysis = self.db.get_cached_analysis(key)
+            if analysis is None:
+                return None
+            self._remember(key, analysis)
+
+        return {**analysis, "token_usage": 0, "cache_read_tokens": 0}
+
+    def _store_analysis(self, key: str, analysis: Dict) -> None:
+        stored = {field: analysis[field] for field in CACHED_FIELDS}
+        self._remember(key, stored)
+        try:
+            self.db.cache_analysis(key, stored)
+        except Exception as e:
+            logger.warning(f"Could not cache analysis: {e}")
+
+    def _stream_analysis(self, request: Dict) -> Tuple[Dict, bool]:
+        """Stream Claude's analysis, returning it and whether it is complete.
+
+        Once the relevance score arrives below min_relevance_score the stream
+        is closed, and the score is returned with STOPPED_EARLY in place of
+        the other sections. Output usage is only reported when a stream
+        ends, so a closed stream's output tokens are estimated from its text.
+        """
+        with self.anthropic.messages.stream(**request) as stream:
+            text = ""
+            for chunk in stream.text_stream:
+                if self.min_relevance_score is None:
+                    continue
+                text += chunk
+                # The score is complete once something follows its digits
+                match = _SCORE_RE.search(text)
+                if not match or match.end() == len(text):
+                    continue
+                relevance_score = int(match.group(1))
+                if relevance_score >= self.min_relevance_score:
+                    break
+
+                logger.info(f"Stopping analysis early at relevance score {relevance_score}")
+                usage = stream.current_message_snapshot.usage
+                output_tokens = max(usage.output_tokens, -(-len(text) // CHARS_PER_TOKEN))
+                return {
+                    "relevance_score": relevance_score,
+                    "summary": STOPPED_EARLY,
+                    "key_findings": STOPPED_EARLY,
+                    "etsy_applications": STOPPED_EARLY,
+                    "token_usage": usage.input_tokens + output_tokens,
+                    "cache_read_tokens": getattr(usage, "cache_read_input_tokens", None) or 0
+                }, False
+
+            return self._parse_response(stream.get_final_message()), True
+
+    def assess_relevance(
+        self,
+        title: str,
+        abstract: str,
+        use_cache: bool = True,
+        stream: bool = False
+    ) -> Dict:
+        """Use Claude to evaluate paper relevance and generate summary.
+
+        Identical content (ignoring case and whitespace) analyzed before is
+        answered from the analysis cache unless use_cache is False. With stream,
+        the response is streamed so low-relevance analyses can stop early.
+        """
+        key = content_hash(title, abstract, self._prompt_fingerprint)
+        if use_cache:
+            cached = self._cached_analysis(key)
+            if cached:
+                logger.info(f"Reusing cached analysis for {title}")
+                return cached
+
+        try:
+            # Get Claude's analysis
+            request = self._build_request(title, abstract)
+            if self._limiter:
+                self._limiter.acquire()
+            if stream:
+                analysis, complete = self._stream_analysis(request)
+            else:
+                analysis, complete = self._parse_response(self.anthropic.messages.create(**request)), True
 
         except Exception as e:
             logger.error(f"Error getting Claude analysis: {e}")
-            return {
-                "relevance_score": 0,
-                "summary": "Error analyzing paper",
-                "key_findings": "Error analyzing paper",
-                "etsy_applications": "Error analyzing paper",
-                "token_usage": 0
+            return self._error_analysis()
+
+        # Only complete, successful analyses are cached, so errors are retried next time
+        if complete:
+            self._store_analysis(key, analysis)
+        return analysis
+
+    def submit_batch(self, papers: List[Dict]) -> str:
+        """Submit papers for analysis as one Message Batch, returning its ID."""
+        batch = self.anthropic.messages.batches.create(requests=[
+            {
+                "custom_id": _custom_id(paper["arxiv_id"]),
+                "params": self._build_request(paper["title"], paper["abstract"])
             }
+            for paper in papers
+        ])
+        logger.info(f"Submitted {len(papers)} papers as analysis batch {batch.id}")
+        return batch.id
+
+    def await_batch(self, batch_id: str, poll_interval: float = 30) -> Dict[str, Dict]:
+        """Wait for a batch to end and return its parsed analyses, keyed by ArXiv ID.
+
+        Polling backs off exponentially from poll_interval. Papers whose
+        request failed or could not be parsed are logged and left out.
+        """
+        deadline = time.monotonic() + BATCH_TIMEOUT
+        batch = self.anthropic.messages.batches.retrieve(batch_id)
+        while batch.processing_status != "ended":
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Analysis batch {batch_id} did not end within {BATCH_TIMEOUT} seconds")
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, BATCH_MAX_POLL_INTERVAL)
+            batch = self.anthropic.messages.batches.retrieve(batch_id)
+
+        analyses = {}
+        for result in self.anthropic.messages.batches.results(batch_id):
+            arxiv_id = _arxiv_id(result.custom_id)
+            if result.result.type != "succeeded":
+                logger.error(f"Batch analysis of {arxiv_id} did not succeed: {result.result.type}")
+                continue
+            try:
+                analyses[arxiv_id] = self._parse_response(result.result.message)
+            except Exception as e:
+                logger.error(f"Error parsing batch analysis of {arxiv_id}: {e}")
+        return analyses
+
+    def assess_relevance_batch(self, papers: List[Dict], poll_interval: float = 30) -> Dict[str, Dict]:
+        """Analyze many papers through the Message Batches API, keyed by ArXiv ID.
 
-    def process_paper(self, paper_data: Dict) -> Dict:
-        """Process a single paper: analyze abstract and title."""
+        Batches are billed at half price but may take minutes to hours, so this
+        suits unattended feed runs. Papers found in the analysis cache are not
+        submitted. Blocks until the batch has ended; errors submitting or
+        polling the batch are raised to the caller.
+        """
+        analyses = {}
+        keys = {}
+        pending = []
+        for paper in papers:
+            key = content_hash(paper["title"], paper["abstract"], self._prompt_fingerprint)
+            cached = self._cached_analysis(key)
+            if cached:
+                analyses[paper["arxiv_id"]] = cached
+            else:
+                keys[paper["arxiv_id"]] = key
+                pending.append(paper)
+
+        if pending:
+            batch_id = self.submit_batch(pending)
+            for arxiv_id, analysis in self.await_batch(batch_id, poll_interval).items():
+                if arxiv_id in keys:
+                    analyses[arxiv_id] = analysis
+                    self._store_analysis(keys[arxiv_id], analysis)
+
+        return {
+            paper["arxiv_id"]: analyses.get(paper["arxiv_id"]) or self._error_analysis()
+            for paper in papers
+        }
+
+    def process_paper(self, paper_data: Dict, force: bool = False, stream: bool = False) -> Dict:
+        """Process a single paper: analyze abstract and title.
+
+        Already-processed papers are returned from the database. With force,
+        the paper is re-analyzed even if it is stored or its content is cached.
+        stream is passed on to assess_relevance.
+        """
         try:
+            if not force and self.db.is_paper_processed(paper_data["arxiv_id"]):
+                logger.info(f"Paper {paper_data['arxiv_id']} already processed")
+                return self.db.get_paper_by_id(paper_data["arxiv_id"])
+
             # Get Claude's analysis
-            analysis = self.assess_relevance(paper_data["title"], paper_data["abstract"])
+            analysis = self.assess_relevance(
+                paper_data["title"],
+                paper_data["abstract"],
+                use_cache=not force,
+                stream=stream
+            )
 
             # Combine all data
             processed_data = {
@@ -102,9 +409,24 @@ Please provide:
                 **analysis
             }
 
-            # Save to database and get updated data
-            return self.db.save_paper(processed_data)
+            # Save to database; the processed_date is filled in place
+            self.db.save_paper(processed_data)
+            return processed_data
 
         except Exception as e:
             logger.error(f"Error processing paper {paper_data.get('arxiv_id')}: {e}")
-            return None 
\ No newline at end of file
+            return None
+
+    def process_papers_batch(self, papers: List[Dict], poll_interval: float = 30) -> List[Dict]:
+        """Process several papers with one batched analysis request."""
+        analyses = self.assess_relevance_batch(papers, poll_interval)
+
+        processed = []
+        for paper_data in papers:
+            try:
+                processed_data = {**paper_data, **analyses[paper_data["arxiv_id"]]}
+                self.db.save_paper(processed_data)
+                processed.append(processed_data)
+            except Exception as e:
+                logger.error(f"Error processing paper {paper_data.get('arxiv_id')}: {e}")
+        return processed
@@ -0,0 +1,18 @@
+import threading
+import time
+
+class RateLimiter:
+    """Space out calls to an external service by a minimum interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next call is allowed."""
+        with self._lock:
+            delay = self._next_call - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_call = time.monotonic() + self.interval
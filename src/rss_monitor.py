@@ -1,16 +1,31 @@
 import feedparser
+import io
 import logging
+import random
 import re
+import threading
 import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
 from .db import Database
+from .http_session import make_session
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# New-style ID in abstract and PDF URLs, ignoring any version or .pdf suffix
+_ARXIV_URL_RE = re.compile(r"arxiv\.org/(?:abs|pdf)/(\d{4}\.\d{4,5})")
+
+# Root elements of RSS 2.0 and RSS 1.0 (RDF) documents, which the fast parser reads
+_RSS_ROOTS = {"rss", "RDF"}
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
 class RSSMonitor:
     def __init__(self, db: Database):
         self.db = db
@@ -20,120 +35,267 @@ class RSSMonitor:
             "http://export.arxiv.org/rss/cs.AI",  # Artificial Intelligence
             "http://export.arxiv.org/rss/econ.GN"  # General Economics
         ]
-        self.request_delay = 5  # seconds between requests
         self.papers_per_feed = 10  # maximum papers to process per feed
         self.max_retries = 3  # maximum number of retries per feed
         self.base_delay = 5  # base delay for exponential backoff
+        self.max_workers = 4  # feeds fetched concurrently, bounding load on the feed host
+        self.request_timeout = 30  # seconds per feed request
+
+        # Keep-alive connections to the feed host, one per concurrent fetch
+        self.session = make_session(pool_maxsize=self.max_workers)
+
+        # Validators of feeds that returned new papers, saved once those are processed
+        self._pending_validators: Dict[str, Tuple[Optional[str], Optional[str], int]] = {}
+        self._pending_lock = threading.Lock()
 
     def extract_arxiv_id(self, url: str) -> Optional[str]:
         """Extract ArXiv ID from URL."""
         # Handle both abstract and PDF URLs
-        patterns = [
-            r"arxiv\.org/abs/([0-9.]+)",
-            r"arxiv\.org/pdf/([0-9.]+)\.pdf",  # Updated pattern for PDF URLs
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        return match.group(1) if (match := _ARXIV_URL_RE.search(url)) else None
 
     def parse_entry(self, entry: Dict) -> Optional[Dict]:
         """Parse a single RSS entry into paper data."""
         try:
-            arxiv_id = self.extract_arxiv_id(entry.get('link', ''))
+            # FeedParserDict lookups resolve key aliases on every access, so read each field once
+            get = entry.get
+            link = get('link', '')
+            arxiv_id = self.extract_arxiv_id(link)
             if not arxiv_id:
-                logger.warning(f"Could not extract ArXiv ID from {entry.get('link', '')}")
+                logger.warning(f"Could not extract ArXiv ID from {link}")
                 return None
 
             # Extract authors - handle both string and list formats
-            authors = entry.get('author', '')
-            if 'authors' in entry:
-                if isinstance(entry['authors'], list):
-                    authors = ', '.join(author.get('name', '') for author in entry['authors'])
+            authors = get('authors')
+            if isinstance(authors, list):
+                authors = ', '.join(author.get('name', '') for author in authors)
+            else:
+                authors = get('author', '')
 
             return {
                 "arxiv_id": arxiv_id,
-                "title": entry.get('title', ''),
+                "title": get('title', ''),
                 "authors": authors,
-                "abstract": entry.get('summary', ''),
-                "arxiv_url": entry.get('link', ''),
-                "published_date": entry.get('published', ''),
+                "abstract": get('summary', ''),
+                "arxiv_url": link,
+                "published_date": get('published', ''),
             }
         except Exception as e:
             logger.error(f"Error parsing entry: {e}")
             return None
 
-    def fetch_feed_with_retry(self, feed_url: str, retry_count: int = 0) -> Optional[feedparser.FeedParserDict]:
-        """Fetch feed with exponential backoff retry."""
-        try:
-            feed = feedparser.parse(feed_url)
-            
-            if feed.bozo:  # Feed parsing error
+    def _iter_entries(self, content: bytes) -> Iterator[Dict]:
+        """Yield the items of an RSS document as feedparser-style entry dicts.
+
+        Items are read incrementally and cleared once converted. Raises
+        ValueError for documents that are not RSS and ET.ParseError for
+        malformed XML, which feedparser's lenient parser handles instead.
+        """
+        events = ET.iterparse(io.BytesIO(content), events=("start", "end"))
+        _, root = next(events)
+        if _local_name(root.tag) not in _RSS_ROOTS:
+            raise ValueError(f"Not an RSS document: {root.tag}")
+
+        for event, elem in events:
+            if event != "end" or _local_name(elem.tag) != "item":
+                continue
+            fields = {}
+            creators = []
+            for child in elem:
+                name, text = _local_name(child.tag), (child.text or "").strip()
+                # Items may list each author in its own creator element
+                if name == "creator":
+                    creators.append(text)
+                else:
+                    fields[name] = text
+            yield {
+                "title": fields.get("title", ""),
+                "link": fields.get("link", ""),
+                "author": ", ".join(creators),
+                "summary": fields.get("description", ""),
+                "published": fields.get("pubDate") or fields.get("date", "")
+            }
+            elem.clear()
+
+    def fetch_feed_with_retry(
+        self,
+        feed_url: str,
+        cache: Optional[Dict] = None
+    ) -> Optional[feedparser.FeedParserDict]:
+        """Fetch feed, retrying with jittered exponential backoff.
+
+        With the validators of a previous download in cache, the request is
+        conditional; an unchanged feed comes back with status 304 and no entries.
+        """
+        headers = {}
+        if cache:
+            if cache.get("etag"):
+                headers["If-None-Match"] = cache["etag"]
+            if cache.get("last_modified"):
+                headers["If-Modified-Since"] = cache["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Download over the pooled session; feedparser would open a new connection per feed
+                response = self.session.get(feed_url, timeout=self.request_timeout, headers=headers)
+                if response.status_code == 304:
+                    return feedparser.FeedParserDict(status=304, entries=[], bozo=False)
+                response.raise_for_status()
+                try:
+                    feed = feedparser.FeedParserDict(
+                        entries=list(self._iter_entries(response.content)),
+                        bozo=False
+                    )
+                except (ET.ParseError, ValueError):
+                    feed = feedparser.parse(response.content)
+
+                if not feed.bozo:
+                    feed["etag"] = response.headers.get("ETag")
+                    feed["modified"] = response.headers.get("Last-Modified")
+                    return feed
                 logger.error(f"Feed error for {feed_url}: {feed.bozo_exception}")
-                if retry_count < self.max_retries:
-                    delay = self.base_delay * (2 ** retry_count)  # exponential backoff
-                    logger.info(f"Retrying {feed_url} in {delay} seconds (attempt {retry_count + 1}/{self.max_retries})")
-                    time.sleep(delay)
-                    return self.fetch_feed_with_retry(feed_url, retry_count + 1)
-                return None
-            
-            return feed
+            except Exception as e:
+                logger.error(f"Error fetching feed {feed_url}: {e}")
 
-        except Exception as e:
-            logger.error(f"Error fetching feed {feed_url}: {e}")
-            if retry_count < self.max_retries:
-                delay = self.base_delay * (2 ** retry_count)  # exponential backoff
-                logger.info(f"Retrying {feed_url} in {delay} seconds (attempt {retry_count + 1}/{self.max_retries})")
+            if attempt < self.max_retries:
+                # Exponential backoff, jittered so feeds failing together don't retry in lockstep
+                delay = self.base_delay * (2 ** attempt) * (0.5 + random.random())
+                logger.info(f"Retrying {feed_url} in {delay:.1f} seconds (attempt {attempt + 1}/{self.max_retries})")
                 time.sleep(delay)
-                return self.fetch_feed_with_retry(feed_url, retry_count + 1)
-            return None
+
+        return None
 
     def fetch_feed(self, feed_url: str) -> List[Dict]:
         """Fetch and parse an RSS feed."""
         logger.info(f"Fetching feed: {feed_url}")
         
-        feed = self.fetch_feed_with_retry(feed_url)
+        cache = self.db.get_feed_cache(feed_url)
+        feed = self.fetch_feed_with_retry(feed_url, cache=cache)
         if not feed:
             self.db.update_feed_health(feed_url, 0)
             return []
 
-        entries = []
+        if feed.get("status") == 304:
+            # Unchanged since the last full download, whose entries were all taken
+            logger.info(f"Feed {feed_url} not modified")
+            self.db.update_feed_health(feed_url, cache["entry_count"])
+            return []
+
+        # Check IDs from the links first so only unseen entries are parsed
+        candidates = []
         for entry in feed.entries:
+            arxiv_id = self.extract_arxiv_id(entry.get('link', ''))
+            if arxiv_id:
+                candidates.append((arxiv_id, entry))
+            else:
+                logger.warning(f"Could not extract ArXiv ID from {entry.get('link', '')}")
+        unprocessed = self.db.filter_unprocessed([arxiv_id for arxiv_id, _ in candidates])
+        # Another feed may have saved a cross-listed paper already; still map it here
+        mapped_ids = [arxiv_id for arxiv_id, _ in candidates if arxiv_id not in unprocessed]
+
+        entries = []
+        truncated = False
+        for arxiv_id, entry in candidates:
+            if arxiv_id not in unprocessed:
+                continue
+            if len(entries) >= self.papers_per_feed:
+                logger.info(f"Reached limit of {self.papers_per_feed} papers for {feed_url}")
+                truncated = True
+                break
             parsed_entry = self.parse_entry(entry)
-            if parsed_entry and not self.db.is_paper_processed(parsed_entry["arxiv_id"]):
+            if parsed_entry:
+                # Take each paper once even if the feed lists it twice
+                unprocessed.discard(arxiv_id)
                 parsed_entry["feed_url"] = feed_url
                 entries.append(parsed_entry)
-                # Record the feed-paper mapping
-                with self.db._get_connection() as conn:
-                    conn.execute("""
-                        INSERT OR IGNORE INTO feed_paper_mapping (arxiv_id, feed_url)
-                        VALUES (?, ?)
-                    """, (parsed_entry["arxiv_id"], feed_url))
-                if len(entries) >= self.papers_per_feed:
-                    logger.info(f"Reached limit of {self.papers_per_feed} papers for {feed_url}")
-                    break
-
-        self.db.update_feed_health(feed_url, len(feed.entries))
+
+        # Record this feed's paper mappings, validators and health in one commit
+        with self.db.transaction() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO feed_paper_mapping (arxiv_id, feed_url)
+                VALUES (?, ?)
+            """, [(arxiv_id, feed_url) for arxiv_id in mapped_ids + [entry["arxiv_id"] for entry in entries]])
+
+            # A feed left with unprocessed papers must be downloaded in full next
+            # time, so validators wait in save_validators until its papers are processed
+            if truncated or entries:
+                self.db.save_feed_cache(feed_url, None, None, len(feed.entries))
+            else:
+                self.db.save_feed_cache(feed_url, feed.get("etag"), feed.get("modified"), len(feed.entries))
+            self.db.update_feed_health(feed_url, len(feed.entries))
+
+        if entries and not truncated:
+            with self._pending_lock:
+                self._pending_validators[feed_url] = (feed.get("etag"), feed.get("modified"), len(feed.entries))
         return entries
 
+    def save_validators(self, failed_feeds: Iterable[str] = ()) -> None:
+        """Save the validators fetch_feed withheld, once the returned papers are processed.
+
+        Feeds in failed_feeds keep none, so their next poll is a full download
+        that offers their unprocessed papers again instead of a 304.
+        """
+        failed_feeds = set(failed_feeds)
+        with self._pending_lock:
+            pending, self._pending_validators = self._pending_validators, {}
+        for feed_url, (etag, modified, entry_count) in pending.items():
+            if feed_url not in failed_feeds:
+                self.db.save_feed_cache(feed_url, etag, modified, entry_count)
+
+    def _monitor_feed(self, feed_url: str) -> List[Dict]:
+        """Fetch one feed for monitor_feeds, logging rather than raising errors."""
+        try:
+            new_entries = self.fetch_feed(feed_url)
+            logger.info(f"Found {len(new_entries)} new papers in {feed_url}")
+            return new_entries
+        except Exception as e:
+            logger.error(f"Error monitoring feed {feed_url}: {e}")
+            return []
+
+    def _iter_feed_results(self, feed_urls: List[str]) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (feed_url, new entries) for each feed as soon as its fetch completes."""
+        # Validators left over from a run that never saved them are dropped
+        with self._pending_lock:
+            self._pending_validators.clear()
+
+        if len(feed_urls) <= 1:
+            for feed_url in feed_urls:
+                yield feed_url, self._monitor_feed(feed_url)
+            return
+
+        # Fetch feeds concurrently; each fetch is dominated by network latency
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(feed_urls))) as pool:
+            futures = {pool.submit(self._monitor_feed, feed_url): feed_url for feed_url in feed_urls}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
     def monitor_feeds(self, feed_urls: Optional[List[str]] = None) -> List[Dict]:
         """Monitor multiple RSS feeds for new papers."""
         feed_urls = feed_urls or self.default_feeds
-        all_new_entries = []
+        entries_by_feed = dict(self._iter_feed_results(feed_urls))
 
+        # Keep results in feed order regardless of completion order, taking
+        # papers cross-listed in several feeds only once
+        all_new_entries = []
+        seen = set()
         for feed_url in feed_urls:
-            try:
-                new_entries = self.fetch_feed(feed_url)
-                all_new_entries.extend(new_entries)
-                logger.info(f"Found {len(new_entries)} new papers in {feed_url}")
-                time.sleep(self.request_delay)  # Wait between feed requests
-            except Exception as e:
-                logger.error(f"Error monitoring feed {feed_url}: {e}")
-
+            for entry in entries_by_feed[feed_url]:
+                if entry["arxiv_id"] not in seen:
+                    seen.add(entry["arxiv_id"])
+                    all_new_entries.append(entry)
         return all_new_entries
 
+    def iter_new_entries(self, feed_urls: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """Yield each feed's new papers as soon as that feed is fetched.
+
+        Unlike monitor_feeds, callers can start on early feeds while slower
+        ones are still downloading. Cross-listed papers are yielded once.
+        """
+        seen = set()
+        for _, entries in self._iter_feed_results(feed_urls or self.default_feeds):
+            new_entries = [entry for entry in entries if entry["arxiv_id"] not in seen]
+            seen.update(entry["arxiv_id"] for entry in new_entries)
+            yield new_entries
+
     def check_feed_health(self, feed_url: str) -> Dict:
         """Check the health status of a feed."""
         health_data = self.db.get_feed_health(feed_url)
@@ -1,11 +1,14 @@
 import os
+import subprocess
+import sys
 import pytest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from src.app import ArxivMonitor
+from src.app import ArxivMonitor, _load_settings
 from src.db import Database
 from src.rss_monitor import RSSMonitor
-from src.paper_processor import PaperProcessor
+from src.paper_processor import STOPPED_EARLY, PaperProcessor
 from src.content_distributor import ContentDistributor
 
 @pytest.fixture
@@ -21,15 +24,17 @@ def mock_env():
         "SMTP_FROM_EMAIL": "test@test.com",
         "SMTP_USE_TLS": "true"
     }):
+        _load_settings.cache_clear()
         yield
+        _load_settings.cache_clear()
 
 @pytest.fixture
 def mock_components():
     """Mock all component classes."""
     with patch("src.app.Database") as mock_db, \
-         patch("src.app.RSSMonitor") as mock_monitor, \
-         patch("src.app.PaperProcessor") as mock_processor, \
-         patch("src.app.ContentDistributor") as mock_distributor:
+         patch("src.rss_monitor.RSSMonitor") as mock_monitor, \
+         patch("src.paper_processor.PaperProcessor") as mock_processor, \
+         patch("src.content_distributor.ContentDistributor") as mock_distributor:
         yield {
             "db": mock_db,
             "monitor": mock_monitor,
@@ -48,15 +53,54 @@ def app(mock_env, mock_components):
     app.content_distributor = mock_components["distributor"].return_value
     return app
 
+def test_cli_import_is_lazy():
+    """Test importing a CLI module loads none of the component SDKs."""
+    code = (
+        "import sys, src.cli.cli_db; "
+        "assert not {'anthropic', 'slack_sdk', 'feedparser'} & set(sys.modules), sorted(sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent)
+
 def test_app_initialization(mock_env, mock_components):
     """Test application initialization."""
     app = ArxivMonitor()
     
-    # Verify component initialization
+    # Only the database is created eagerly
     mock_components["db"].assert_called_once()
+    mock_components["monitor"].assert_not_called()
+    mock_components["processor"].assert_not_called()
+    mock_components["distributor"].assert_not_called()
+    
+    # Other components are created once, on first access
+    assert app.rss_monitor is app.rss_monitor
+    assert app.paper_processor is app.paper_processor
+    assert app.content_distributor is app.content_distributor
     mock_components["monitor"].assert_called_once()
-    mock_components["processor"].assert_called_once()
+    mock_components["processor"].assert_called_once_with(
+        app.db, "mock_claude_key", None, None
+    )
     mock_components["distributor"].assert_called_once()
+    assert mock_components["distributor"].call_args[0][2]["host"] == "smtp.test.com"
+
+def test_close(app, mock_components):
+    """Test close shuts down the worker pools and closes open connections."""
+    app.session = MagicMock()
+    assert "_processing_pool" not in vars(app)
+    pool = app._processing_pool
+
+    app.close()
+
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+    assert "_distribution_pool" not in vars(app)
+    app.rss_monitor.session.close.assert_called_once()
+    app.content_distributor.close.assert_called_once()
+    app.session.close.assert_called_once()
+    app.db.close.assert_called_once()
+
+    # The pools are recreated if the instance is used again
+    assert app._processing_pool is not pool
+    app.close()
 
 def test_process_feeds(app, mock_components):
     """Test feed processing workflow."""
@@ -74,7 +118,8 @@ def test_process_feeds(app, mock_components):
         }
     ]
     
-    app.rss_monitor.monitor_feeds.return_value = mock_papers
+    # Each feed's papers arrive separately
+    app.rss_monitor.iter_new_entries.return_value = iter([mock_papers[:1], mock_papers[1:]])
     app.paper_processor.process_paper.side_effect = mock_papers
     
     # Test processing with default settings
@@ -86,7 +131,9 @@ def test_process_feeds(app, mock_components):
     assert len(results) == 2
     
     # Verify component calls
-    app.rss_monitor.monitor_feeds.assert_called_once_with(None)
+    app.db.load_processed_ids.assert_called_once()
+    app.rss_monitor.iter_new_entries.assert_called_once_with(None)
+    app.rss_monitor.monitor_feeds.assert_not_called()
     assert app.paper_processor.process_paper.call_count == 2
     
     # Verify only relevant papers are distributed
@@ -96,6 +143,38 @@ def test_process_feeds(app, mock_components):
         ["test@test.com"]
     )
 
+def test_process_feeds_failed_paper_keeps_feed_uncached(app, mock_components):
+    """Test validators are saved only for feeds whose papers all processed."""
+    mock_papers = [
+        {"arxiv_id": "2301.12345", "feed_url": "http://export.arxiv.org/rss/cs.IR", "relevance_score": 8},
+        {"arxiv_id": "2301.12346", "feed_url": "http://export.arxiv.org/rss/cs.LG", "relevance_score": 8}
+    ]
+    app.rss_monitor.iter_new_entries.return_value = iter([mock_papers[:1], mock_papers[1:]])
+    app.paper_processor.process_paper.side_effect = lambda paper: paper if paper is mock_papers[0] else None
+    failed_feeds = []
+    app.rss_monitor.save_validators.side_effect = failed_feeds.extend
+
+    assert app.process_feeds() == mock_papers[:1]
+    assert failed_feeds == ["http://export.arxiv.org/rss/cs.LG"]
+
+def test_process_feeds_batch(app, mock_components):
+    """Test feed papers go through the batch API when enabled, falling back on error."""
+    mock_papers = [{"arxiv_id": "2301.12345", "title": "Paper 1", "relevance_score": 8}]
+    app.settings = {**app.settings, "use_batch_api": True}
+    app.rss_monitor.monitor_feeds.return_value = mock_papers
+    app.paper_processor.process_papers_batch.return_value = mock_papers
+
+    assert app.process_feeds() == mock_papers
+    app.paper_processor.process_papers_batch.assert_called_once_with(mock_papers)
+    app.paper_processor.process_paper.assert_not_called()
+    app.content_distributor.distribute_paper.assert_called_once()
+
+    app.paper_processor.process_papers_batch.side_effect = Exception("Batch error")
+    app.paper_processor.process_paper.return_value = mock_papers[0]
+
+    assert app.process_feeds() == mock_papers
+    app.paper_processor.process_paper.assert_called_once_with(mock_papers[0])
+
 def test_process_single_paper(app, mock_components):
     """Test single paper processing workflow."""
     mock_paper = {
@@ -108,6 +187,7 @@ def test_process_single_paper(app, mock_components):
     app.rss_monitor.extract_arxiv_id.return_value = "2301.12345"
     app.paper_processor.process_paper.return_value = mock_paper
     app.db.is_paper_processed.return_value = False
+    app.fetch_papers_batch = MagicMock(return_value={"2301.12345": dict(mock_paper)})
     
     # Test processing with distribution
     result = app.process_single_paper(
@@ -120,13 +200,59 @@ def test_process_single_paper(app, mock_components):
     
     # Verify component calls
     app.rss_monitor.extract_arxiv_id.assert_called_once()
+    app.fetch_papers_batch.assert_called_once_with(["2301.12345"])
     app.paper_processor.process_paper.assert_called_once()
+    assert app.paper_processor.process_paper.call_args.kwargs["stream"] is True
     app.content_distributor.distribute_paper.assert_called_once_with(
         mock_paper,
         ["#test"],
         ["test@test.com"]
     )
 
+def test_process_single_paper_with_id(app, mock_components):
+    """Test a known ArXiv ID skips URL parsing."""
+    mock_paper = {
+        "arxiv_id": "2301.12345",
+        "title": "Test Paper",
+        "relevance_score": 8
+    }
+    
+    app.paper_processor.process_paper.return_value = mock_paper
+    app.db.is_paper_processed.return_value = False
+    app.fetch_papers_batch = MagicMock(return_value={"2301.12345": dict(mock_paper)})
+    
+    result = app.process_single_paper(
+        "https://arxiv.org/abs/2301.12345",
+        distribute=False,
+        arxiv_id="2301.12345"
+    )
+    
+    assert result == mock_paper
+    app.rss_monitor.extract_arxiv_id.assert_not_called()
+    app.fetch_papers_batch.assert_called_once_with(["2301.12345"])
+
+def test_process_single_paper_versioned_id(app, mock_components):
+    """Test a versioned ArXiv ID is checked and fetched without its version."""
+    mock_paper = {
+        "arxiv_id": "2301.12345",
+        "title": "Test Paper",
+        "relevance_score": 8
+    }
+    
+    app.paper_processor.process_paper.return_value = mock_paper
+    app.db.is_paper_processed.return_value = False
+    app.fetch_papers_batch = MagicMock(return_value={"2301.12345": dict(mock_paper)})
+    
+    result = app.process_single_paper(
+        "https://arxiv.org/abs/2301.12345v2",
+        distribute=False,
+        arxiv_id="2301.12345v2"
+    )
+    
+    assert result == mock_paper
+    app.db.is_paper_processed.assert_called_once_with("2301.12345")
+    app.fetch_papers_batch.assert_called_once_with(["2301.12345"])
+
 def test_process_single_paper_no_distribute(app, mock_components):
     """Test single paper processing without distribution."""
     mock_paper = {
@@ -138,6 +264,7 @@ def test_process_single_paper_no_distribute(app, mock_components):
     app.rss_monitor.extract_arxiv_id.return_value = "2301.12345"
     app.paper_processor.process_paper.return_value = mock_paper
     app.db.is_paper_processed.return_value = False
+    app.fetch_papers_batch = MagicMock(return_value={"2301.12345": dict(mock_paper)})
     
     result = app.process_single_paper(
         "https://arxiv.org/abs/2301.12345",
@@ -147,6 +274,83 @@ def test_process_single_paper_no_distribute(app, mock_components):
     assert result == mock_paper
     app.content_distributor.distribute_paper.assert_not_called()
 
+def test_process_single_paper_stopped_early(app, mock_components):
+    """Test an analysis stopped early is saved as such and not distributed."""
+    app.paper_processor = PaperProcessor(app.db, "mock_api_key", min_relevance_score=5)
+    stream = MagicMock()
+    stream.text_stream = iter(["Relevance score: 3/10\n\n", "Executive summary: unread"])
+    stream.current_message_snapshot.usage = MagicMock(
+        input_tokens=100, output_tokens=1, cache_read_input_tokens=0
+    )
+    app.paper_processor.anthropic = MagicMock()
+    app.paper_processor.anthropic.messages.stream.return_value.__enter__.return_value = stream
+    app.db.is_paper_processed.return_value = False
+    app.db.get_cached_analysis.return_value = None
+    app.fetch_papers_batch = MagicMock(return_value={"2301.12345": {
+        "arxiv_id": "2301.12345",
+        "title": "Test Paper",
+        "abstract": "Test abstract"
+    }})
+
+    result = app.process_single_paper(
+        "https://arxiv.org/abs/2301.12345",
+        distribute=True,
+        arxiv_id="2301.12345"
+    )
+
+    assert result["relevance_score"] == 3
+    assert app.db.save_paper.call_args[0][0]["summary"] == STOPPED_EARLY
+    app.content_distributor.distribute_paper.assert_not_called()
+
+ARXIV_API_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>ArXiv Query</title>
+  <entry>
+    <id>http://arxiv.org/abs/2301.12345v1</id>
+    <title>Paper
+      1</title>
+    <summary>Abstract 1</summary>
+    <author><name>John Doe</name></author>
+    <author><name>Jane Smith</name></author>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2301.12346v2</id>
+    <title>Paper 2</title>
+    <summary>Abstract 2</summary>
+    <author><name>Jane Smith</name></author>
+  </entry>
+</feed>"""
+
+@patch("src.rate_limit.time.sleep")
+def test_fetch_papers_batch(mock_sleep, app, mock_components):
+    """Test fetching several papers with one ArXiv API query."""
+    app.session = MagicMock()
+    mock_get = app.session.get
+    mock_get.return_value = MagicMock(content=ARXIV_API_RESPONSE)
+    
+    results = app.fetch_papers_batch(["2301.12345", "2301.12346"])
+    
+    # One request for the whole batch
+    mock_get.assert_called_once()
+    assert "id_list=2301.12345,2301.12346" in mock_get.call_args[0][0]
+    
+    assert set(results) == {"2301.12345", "2301.12346"}
+    assert results["2301.12345"]["title"] == "Paper 1"
+    assert results["2301.12345"]["authors"] == "John Doe, Jane Smith"
+    assert results["2301.12346"]["abstract"] == "Abstract 2"
+
+def test_session_retries_transient_errors(app):
+    """Test the ArXiv session retries throttling and server errors with backoff."""
+    retry = app.session.get_adapter("http://export.arxiv.org").max_retries
+    assert retry.total == 4
+    assert 429 in retry.status_forcelist and 503 in retry.status_forcelist
+    assert retry.backoff_jitter > 0
+    assert retry.respect_retry_after_header
+
+    # Even the first retry waits out ArXiv's 3 second spacing
+    retry = retry.increment("GET", "/api/query", error=ConnectionError("reset"))
+    assert retry.get_backoff_time() >= 3.0
+
 def test_check_feed_health(app, mock_components):
     """Test feed health checking."""
     mock_health = {
@@ -175,9 +379,15 @@ def test_get_recent_papers(app, mock_components):
     # Test without relevance filter
     results = app.get_recent_papers(days=7)
     assert len(results) == 3
-    app.db.get_recent_papers.assert_called_with(7)
+    app.db.get_recent_papers.assert_called_with(
+        7, min_relevance=None, max_relevance=None, keyword=None, year=None, with_feed=False, columns=None, as_dict=True
+    )
     
-    # Test with relevance filter
+    # Test with relevance filter, which is applied by the database
+    app.db.get_recent_papers.return_value = [mock_papers[0], mock_papers[2]]
     results = app.get_recent_papers(days=7, min_relevance=7)
     assert len(results) == 2
-    assert all(p["relevance_score"] >= 7 for p in results) 
\ No newline at end of file
+    assert all(p["relevance_score"] >= 7 for p in results)
+    app.db.get_recent_papers.assert_called_with(
+        7, min_relevance=7, max_relevance=None, keyword=None, year=None, with_feed=False, columns=None, as_dict=True
+    )
@@ -1,3 +1,5 @@
+import smtplib
+
 import pytest
 from unittest.mock import MagicMock, patch
 
@@ -62,6 +64,14 @@ def test_format_paper_message_email(distributor, mock_paper_data):
     assert mock_paper_data["key_findings"] in message
     assert mock_paper_data["etsy_applications"] in message
 
+def test_format_paper_message_cached(distributor, mock_paper_data):
+    """Test formatting is cached on the message content, not the paper ID."""
+    first = distributor.format_paper_message(mock_paper_data, "slack")
+    assert distributor.format_paper_message(dict(mock_paper_data), "slack") is first
+
+    rescored = distributor.format_paper_message({**mock_paper_data, "relevance_score": 3}, "slack")
+    assert "3/10" in rescored
+
 @patch('slack_sdk.WebClient.chat_postMessage')
 def test_send_slack_message(mock_post_message, distributor, mock_paper_data, mock_db):
     """Test sending Slack messages."""
@@ -78,14 +88,11 @@ def test_send_slack_message(mock_post_message, distributor, mock_paper_data, moc
             unfurl_links=True
         )
     
-    # Verify distribution logging
-    assert mock_db.log_distribution.call_count == len(channels)
-    for channel in channels:
-        mock_db.log_distribution.assert_any_call(
-            mock_paper_data["arxiv_id"],
-            f"slack:{channel}",
-            True
-        )
+    # Verify distribution logging is batched into one write
+    mock_db.log_distribution_batch.assert_called_once_with([
+        (mock_paper_data["arxiv_id"], f"slack:{channel}", True, None)
+        for channel in channels
+    ])
 
 @patch('slack_sdk.WebClient.chat_postMessage')
 def test_send_slack_message_error(mock_post_message, distributor, mock_paper_data, mock_db):
@@ -94,17 +101,38 @@ def test_send_slack_message_error(mock_post_message, distributor, mock_paper_dat
     
     distributor.send_slack_message(mock_paper_data, ["#test-channel"])
     
-    mock_db.log_distribution.assert_called_once_with(
+    mock_db.log_distribution_batch.assert_called_once_with([(
         mock_paper_data["arxiv_id"],
         "slack:#test-channel",
         False,
         "Failed to send to Slack channel #test-channel: Slack error"
-    )
+    )])
+
+@patch('slack_sdk.WebClient.chat_postMessage')
+def test_send_slack_message_partial_failure(mock_post_message, distributor, mock_paper_data, mock_db):
+    """Test one failing channel does not stop the others, and rows keep channel order."""
+    def post_message(channel, **kwargs):
+        if channel == "#broken":
+            raise Exception("channel_not_found")
+
+    mock_post_message.side_effect = post_message
+    channels = ["#test-channel", "#broken", "#research"]
+
+    distributor.send_slack_message(mock_paper_data, channels)
+
+    assert mock_post_message.call_count == len(channels)
+    rows = mock_db.log_distribution_batch.call_args[0][0]
+    assert [(row[1], row[2]) for row in rows] == [
+        ("slack:#test-channel", True),
+        ("slack:#broken", False),
+        ("slack:#research", True)
+    ]
 
 @patch('smtplib.SMTP')
 def test_send_email(mock_smtp, distributor, mock_paper_data, mock_db):
     """Test sending emails."""
     recipients = ["test1@test.com", "test2@test.com"]
+    mock_smtp.return_value.send_message.return_value = {}
     
     distributor.send_email(mock_paper_data, recipients)
     
@@ -114,7 +142,7 @@ def test_send_email(mock_smtp, distributor, mock_paper_data, mock_db):
         distributor.smtp_settings["port"]
     )
     
-    mock_smtp_instance = mock_smtp.return_value.__enter__.return_value
+    mock_smtp_instance = mock_smtp.return_value
     
     # Verify TLS and login
     mock_smtp_instance.starttls.assert_called_once()
@@ -123,17 +151,76 @@ def test_send_email(mock_smtp, distributor, mock_paper_data, mock_db):
         distributor.smtp_settings["password"]
     )
     
-    # Verify emails sent
-    assert mock_smtp_instance.send_message.call_count == len(recipients)
+    # Verify one message is sent to every recipient
+    mock_smtp_instance.send_message.assert_called_once()
+    assert mock_smtp_instance.send_message.call_args.kwargs["to_addrs"] == recipients
     
-    # Verify distribution logging
-    assert mock_db.log_distribution.call_count == len(recipients)
-    for recipient in recipients:
-        mock_db.log_distribution.assert_any_call(
+    # Verify distribution logging is batched into one write
+    mock_db.log_distribution_batch.assert_called_once_with([
+        (mock_paper_data["arxiv_id"], f"email:{recipient}", True, None)
+        for recipient in recipients
+    ])
+
+@patch('smtplib.SMTP')
+def test_send_email_refused_recipients(mock_smtp, distributor, mock_paper_data, mock_db):
+    """Test recipients refused by the server are logged as failures."""
+    mock_smtp.return_value.send_message.return_value = {
+        "bad@test.com": (550, b"No such user")
+    }
+
+    distributor.send_email(mock_paper_data, ["test@test.com", "bad@test.com"])
+
+    mock_db.log_distribution_batch.assert_called_once_with([
+        (mock_paper_data["arxiv_id"], "email:test@test.com", True, None),
+        (
             mock_paper_data["arxiv_id"],
-            f"email:{recipient}",
-            True
+            "email:bad@test.com",
+            False,
+            "Failed to send email to bad@test.com: 550 No such user"
         )
+    ])
+
+    # Every recipient refused raises instead of returning
+    mock_smtp.return_value.send_message.side_effect = smtplib.SMTPRecipientsRefused(
+        {"test@test.com": (550, b"No such user")}
+    )
+    distributor.send_email(mock_paper_data, ["test@test.com"])
+    assert mock_db.log_distribution_batch.call_args[0][0][0][2] is False
+
+@patch('smtplib.SMTP')
+def test_send_email_reuses_connection(mock_smtp, distributor, mock_paper_data):
+    """Test one SMTP session serves several papers and is closed explicitly."""
+    distributor.send_email(mock_paper_data, ["test1@test.com"])
+    distributor.send_email(mock_paper_data, ["test2@test.com"])
+
+    mock_smtp_instance = mock_smtp.return_value
+    mock_smtp.assert_called_once()
+    mock_smtp_instance.login.assert_called_once()
+    mock_smtp_instance.noop.assert_called_once()
+    assert mock_smtp_instance.send_message.call_count == 2
+
+    distributor.close()
+    mock_smtp_instance.quit.assert_called_once()
+
+@patch('smtplib.SMTP')
+def test_send_email_reconnects(mock_smtp, distributor, mock_paper_data, mock_db):
+    """Test a stale or dropped SMTP session is replaced."""
+    stale = MagicMock()
+    stale.noop.side_effect = smtplib.SMTPServerDisconnected("gone")
+    fresh = MagicMock()
+    fresh.send_message.side_effect = smtplib.SMTPServerDisconnected("dropped")
+    replacement = MagicMock()
+    replacement.send_message.return_value = {}
+    mock_smtp.side_effect = [fresh, replacement]
+    distributor._smtp = stale
+
+    distributor.send_email(mock_paper_data, ["test@test.com"])
+
+    assert mock_smtp.call_count == 2
+    replacement.send_message.assert_called_once()
+    mock_db.log_distribution_batch.assert_called_once_with([
+        (mock_paper_data["arxiv_id"], "email:test@test.com", True, None)
+    ])
 
 @patch('smtplib.SMTP')
 def test_send_email_error(mock_smtp, distributor, mock_paper_data, mock_db):
@@ -142,12 +229,12 @@ def test_send_email_error(mock_smtp, distributor, mock_paper_data, mock_db):
     
     distributor.send_email(mock_paper_data, ["test@test.com"])
     
-    mock_db.log_distribution.assert_called_once_with(
+    mock_db.log_distribution_batch.assert_called_once_with([(
         mock_paper_data["arxiv_id"],
         "email:test@test.com",
         False,
         "SMTP connection failed: SMTP error"
-    )
+    )])
 
 def test_distribute_paper(distributor, mock_paper_data):
     """Test paper distribution to all channels."""
@@ -171,4 +258,14 @@ def test_distribute_paper(distributor, mock_paper_data):
     distributor.send_email.assert_called_once_with(
         mock_paper_data,
         email_recipients
-    ) 
\ No newline at end of file
+    ) 
+
+def test_distribute_paper_single_channel(distributor, mock_paper_data):
+    """Test distribution skips channels that are not configured."""
+    distributor.send_slack_message = MagicMock()
+    distributor.send_email = MagicMock()
+
+    distributor.distribute_paper(mock_paper_data, email_recipients=["test@test.com"])
+
+    distributor.send_slack_message.assert_not_called()
+    distributor.send_email.assert_called_once_with(mock_paper_data, ["test@test.com"])
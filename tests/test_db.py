@@ -0,0 +1,353 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from unittest.mock import patch
+
+import pytest
+
+from src import db as db_module
+from src.db import Database
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "test.db"))
+
+@pytest.fixture
+def saved_papers(db):
+    """Save a few papers with different scores and text."""
+    papers = [
+        {
+            "arxiv_id": "2301.12345",
+            "title": "Search Ranking for Marketplaces",
+            "abstract": "Learning to rank",
+            "summary": "Summary 1",
+            "key_findings": "Findings 1",
+            "etsy_applications": "Applications 1",
+            "relevance_score": 8
+        },
+        {
+            "arxiv_id": "2301.12346",
+            "title": "Graph Neural Networks",
+            "abstract": "Message passing",
+            "summary": "Useful for RECOMMENDATION systems",
+            "key_findings": "Findings 2",
+            "etsy_applications": "Applications 2",
+            "relevance_score": 5
+        },
+        {
+            "arxiv_id": "2301.12347",
+            "title": "Pricing Dynamics",
+            "abstract": "Auctions with 100% reserve",
+            "summary": "Summary 3",
+            "key_findings": "Findings 3",
+            "etsy_applications": "Applications 3",
+            "relevance_score": 9
+        }
+    ]
+    for paper in papers:
+        db.save_paper(paper)
+    return papers
+
+def test_get_recent_papers(db, saved_papers):
+    """Test retrieving recent papers without filters."""
+    papers = db.get_recent_papers(days=7)
+
+    assert {p["arxiv_id"] for p in papers} == {p["arxiv_id"] for p in saved_papers}
+
+def test_get_recent_papers_relevance_filter(db, saved_papers):
+    """Test relevance filtering in SQL."""
+    papers = db.get_recent_papers(days=7, min_relevance=6)
+    assert {p["arxiv_id"] for p in papers} == {"2301.12345", "2301.12347"}
+
+    papers = db.get_recent_papers(days=7, min_relevance=6, max_relevance=8)
+    assert [p["arxiv_id"] for p in papers] == ["2301.12345"]
+
+def test_get_recent_papers_keyword_filter(db, saved_papers):
+    """Test case-insensitive keyword search across text fields."""
+    papers = db.get_recent_papers(days=7, keyword="recommendation")
+    assert [p["arxiv_id"] for p in papers] == ["2301.12346"]
+
+    papers = db.get_recent_papers(days=7, keyword="100%")
+    assert [p["arxiv_id"] for p in papers] == ["2301.12347"]
+
+    assert db.get_recent_papers(days=7, keyword="nonexistent") == []
+
+def test_get_recent_papers_year_filter(db, saved_papers):
+    """Test filtering by processing year."""
+    year = int(db.get_recent_papers(days=7)[0]["processed_date"][:4])
+
+    assert len(db.get_recent_papers(days=7, year=year)) == 3
+    assert db.get_recent_papers(days=7, year=year - 1) == []
+
+def test_keyword_search_tracks_updates(db, saved_papers):
+    """Test the full-text index follows re-saved papers."""
+    assert db.has_fts
+
+    # Prefix matching on the last word of the phrase
+    papers = db.get_recent_papers(days=7, keyword="recommend")
+    assert [p["arxiv_id"] for p in papers] == ["2301.12346"]
+
+    db.save_paper({**saved_papers[1], "summary": "Updated summary"})
+
+    assert db.get_recent_papers(days=7, keyword="recommendation") == []
+    papers = db.get_recent_papers(days=7, keyword="updated")
+    assert [p["arxiv_id"] for p in papers] == ["2301.12346"]
+
+def test_iter_papers(db, saved_papers):
+    """Test streaming papers with an optional year filter."""
+    papers = db.iter_papers(days=3650)
+    assert not isinstance(papers, list)
+    assert {p["arxiv_id"] for p in papers} == {p["arxiv_id"] for p in saved_papers}
+
+    year = int(next(db.iter_papers(days=3650))["processed_date"][:4])
+    assert len(list(db.iter_papers(days=3650, year=year))) == 3
+    assert list(db.iter_papers(days=3650, year=year - 1)) == []
+
+def test_iter_papers_does_not_block_writers(db, saved_papers):
+    """Test a partly read iterator leaves the shared connection to other threads."""
+    papers = db.iter_papers(days=3650)
+    next(papers)
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        pool.submit(db.save_paper, {"arxiv_id": "2301.12348", "relevance_score": 4}).result(timeout=5)
+    finally:
+        # Closing the iterator first lets a blocked writer finish if the check fails
+        papers.close()
+        pool.shutdown()
+    assert db.is_paper_processed("2301.12348")
+
+def test_statistics_aggregates(db, saved_papers):
+    """Test score distribution and monthly statistics."""
+    assert db.get_score_distribution(days=365) == {5: 1, 8: 1, 9: 1}
+
+    monthly = db.get_monthly_stats(days=365)
+    assert len(monthly) == 1
+    assert monthly[0]["paper_count"] == 3
+    assert monthly[0]["avg_relevance"] == pytest.approx(22 / 3)
+
+def test_connection_reuse(db):
+    """Test one connection is shared across threads and reopened after close."""
+    with db._get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert pool.submit(lambda: db.is_paper_processed("2301.12345")).result() is False
+    with db._get_connection() as shared:
+        assert shared is conn
+
+    db.close()
+    with db._get_connection() as reopened:
+        assert reopened is not conn
+
+def test_get_unprocessed(db, saved_papers):
+    """Test the queue holds feed papers without a processed record."""
+    with db._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO feed_paper_mapping (arxiv_id, feed_url) VALUES (?, ?)",
+            [
+                ("2301.12345", "http://export.arxiv.org/rss/cs.IR"),
+                ("2301.99999", "http://export.arxiv.org/rss/cs.IR"),
+                ("2301.99999", "http://export.arxiv.org/rss/cs.LG"),
+                ("2301.88888", "http://export.arxiv.org/rss/cs.LG")
+            ]
+        )
+
+    assert sorted(db.get_unprocessed(limit=5)) == ["2301.88888", "2301.99999"]
+    assert len(db.get_unprocessed(limit=1)) == 1
+
+def test_iter_papers_columns(db, saved_papers):
+    """Test streaming projected rows as tuples."""
+    rows = list(db.iter_papers(days=3650, columns=["arxiv_id", "relevance_score"]))
+    assert sorted(rows) == [("2301.12345", 8), ("2301.12346", 5), ("2301.12347", 9)]
+
+    with pytest.raises(ValueError):
+        list(db.iter_papers(days=3650, columns=["arxiv_id; DROP TABLE processed_papers"]))
+
+def test_get_recent_papers_with_feed(db, saved_papers):
+    """Test the feed URL is only joined in when requested."""
+    with db._get_connection() as conn:
+        conn.execute(
+            "INSERT INTO feed_paper_mapping (arxiv_id, feed_url) VALUES (?, ?)",
+            ("2301.12345", "http://export.arxiv.org/rss/cs.IR")
+        )
+
+    assert "feed_url" not in db.get_recent_papers(days=7)[0]
+
+    papers = {p["arxiv_id"]: p for p in db.get_recent_papers(days=7, with_feed=True)}
+    assert papers["2301.12345"]["feed_url"] == "http://export.arxiv.org/rss/cs.IR"
+    assert papers["2301.12346"]["feed_url"] is None
+
+def test_log_distribution_batch(db, saved_papers):
+    """Test distribution attempts are written in one batch."""
+    db.log_distribution_batch([
+        ("2301.12345", "slack:#research", True, None),
+        ("2301.12345", "email:test@test.com", False, "SMTP error")
+    ])
+    db.log_distribution_batch([])
+
+    with db._get_connection() as conn:
+        rows = conn.execute(
+            "SELECT channel, success, error_message FROM distribution_log ORDER BY id"
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("slack:#research", 1, None),
+        ("email:test@test.com", 0, "SMTP error")
+    ]
+
+def test_lookup_indexes(db):
+    """Test the common lookups are served by indexes rather than table scans."""
+    queries = {
+        "idx_papers_date_score": (
+            "SELECT * FROM processed_papers WHERE processed_date >= datetime('now', '-7 days') "
+            "ORDER BY processed_date DESC"
+        ),
+        "idx_distlog_arxiv": "SELECT * FROM distribution_log WHERE arxiv_id = '2301.12345'",
+        "idx_feedmap_feed": "SELECT * FROM feed_paper_mapping WHERE feed_url = 'http://example.com'"
+    }
+    with db._get_connection() as conn:
+        for index, query in queries.items():
+            plan = " ".join(row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + query))
+            assert index in plan
+
+@pytest.mark.parametrize("has_returning", [True, False])
+def test_save_paper_processed_date(db, has_returning):
+    """Test save_paper reads back processed_date with and without RETURNING."""
+    with patch.object(db_module, "HAS_RETURNING", has_returning):
+        paper = db.save_paper({"arxiv_id": "2301.12345", "title": "Test Paper"})
+
+    assert paper["processed_date"]
+    assert db.get_paper_by_id("2301.12345")["processed_date"] == paper["processed_date"]
+
+def test_feed_health_cache(db):
+    """Test feed health is cached briefly and refreshed on update."""
+    feed_url = "http://export.arxiv.org/rss/cs.IR"
+    assert db.get_feed_health(feed_url) is None
+
+    db.update_feed_health(feed_url, 0)
+    assert db.get_feed_health(feed_url)["consecutive_empty_fetches"] == 1
+
+    # A write from elsewhere is not seen until the entry expires
+    with db._get_connection() as conn:
+        conn.execute("UPDATE feed_health SET consecutive_empty_fetches = 5")
+    assert db.get_feed_health(feed_url)["consecutive_empty_fetches"] == 1
+
+    with patch.object(db_module, "_HEALTH_TTL", 0):
+        assert db.get_feed_health(feed_url)["consecutive_empty_fetches"] == 5
+
+def test_feed_cache(db):
+    """Test feed validators are stored and replaced per feed."""
+    feed_url = "http://export.arxiv.org/rss/cs.IR"
+    assert db.get_feed_cache(feed_url) is None
+
+    db.save_feed_cache(feed_url, '"abc"', "Mon, 01 Jan 2024 00:00:00 GMT", 25)
+    db.save_feed_cache(feed_url, '"def"', None, 30)
+    assert db.get_feed_cache(feed_url) == {"etag": '"def"', "last_modified": None, "entry_count": 30}
+
+def test_get_usage_stats(db, saved_papers):
+    """Test usage totals and breakdowns are aggregated in SQL."""
+    db.save_paper({**saved_papers[0], "token_usage": 100})
+    db.save_paper({**saved_papers[1], "token_usage": 50})
+    with db._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO feed_paper_mapping (arxiv_id, feed_url) VALUES (?, ?)",
+            [
+                ("2301.12345", "http://export.arxiv.org/rss/cs.IR"),
+                ("2301.12345", "http://export.arxiv.org/rss/cs.LG"),
+                ("2301.12346", "http://export.arxiv.org/rss/cs.IR")
+            ]
+        )
+
+    stats = db.get_usage_stats(days=7)
+
+    assert stats["total_papers"] == 3
+    assert stats["total_tokens"] == 150
+    assert stats["by_feed"] == {
+        "http://export.arxiv.org/rss/cs.IR": 2,
+        "http://export.arxiv.org/rss/cs.LG": 1,
+        "unknown": 1
+    }
+    assert stats["by_score"] == {5: 1, 8: 1, 9: 1}
+
+def test_get_recent_papers_columns(db, saved_papers):
+    """Test listing only the requested columns."""
+    papers = db.get_recent_papers(days=7, min_relevance=9, columns=["arxiv_id", "title"])
+    assert papers == [{"arxiv_id": "2301.12347", "title": "Pricing Dynamics"}]
+
+    with pytest.raises(ValueError):
+        db.get_recent_papers(days=7, columns=["title FROM processed_papers --"])
+
+def test_get_recent_papers_rows(db, saved_papers):
+    """Test read-only callers can skip dict conversion."""
+    papers = db.get_recent_papers(days=7, min_relevance=9, as_dict=False)
+    assert not isinstance(papers[0], dict)
+    assert papers[0]["title"] == "Pricing Dynamics"
+
+def test_update_feed_health(db):
+    """Test empty fetches are counted and reset by a non-empty one."""
+    feed_url = "http://export.arxiv.org/rss/cs.IR"
+    with db._get_connection() as conn:
+        conn.execute("INSERT INTO feed_health (feed_url, skip_days) VALUES (?, 'Sat,Sun')", (feed_url,))
+
+    with patch.object(db_module, "_HEALTH_TTL", 0):
+        db.update_feed_health(feed_url, 0)
+        db.update_feed_health(feed_url, 0)
+        health = db.get_feed_health(feed_url)
+        assert health["consecutive_empty_fetches"] == 2
+        assert health["skip_days"] == "Sat,Sun"
+
+        db.update_feed_health(feed_url, 12)
+        health = db.get_feed_health(feed_url)
+        assert health["consecutive_empty_fetches"] == 0
+        assert health["last_entry_count"] == 12
+
+def test_known_ids_cache(db, saved_papers):
+    """Test processed checks are served from the loaded ID set."""
+    assert db.load_processed_ids() == {p["arxiv_id"] for p in saved_papers}
+
+    with patch.object(db, "_get_connection") as mock_connection:
+        assert db.is_paper_processed("2301.12345")
+        assert not db.is_paper_processed("2301.99999")
+        mock_connection.assert_not_called()
+
+    db.save_paper({"arxiv_id": "2301.99999", "title": "New Paper"})
+    assert db.is_paper_processed("2301.99999")
+
+def test_transaction(db, saved_papers):
+    """Test grouped writes commit together, nest, and roll back on error."""
+    with db.transaction():
+        db.save_paper({"arxiv_id": "2301.00001", "title": "First"})
+        db.log_distribution_batch([("2301.00001", "slack:#research", True, None)])
+    assert db.get_paper_by_id("2301.00001")["title"] == "First"
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.save_paper({"arxiv_id": "2301.00002", "title": "Second"})
+            raise RuntimeError("abort")
+    assert db.get_paper_by_id("2301.00002") is None
+
+    with db._get_connection() as conn:
+        assert not conn.in_transaction
+
+def test_analysis_cache(db):
+    """Test analyses round-trip through the cache by content hash."""
+    assert db.get_cached_analysis("abc") is None
+
+    db.cache_analysis("abc", {"relevance_score": 7, "summary": "Summary"})
+    assert db.get_cached_analysis("abc") == {"relevance_score": 7, "summary": "Summary"}
+
+def test_filter_unprocessed(db, saved_papers):
+    """Test unprocessed IDs are found in one lookup, with or without the ID set."""
+    ids = ["2301.12345", "2301.99999", "2301.99999", "2301.88888"]
+    assert db.filter_unprocessed(ids) == {"2301.99999", "2301.88888"}
+    assert db.filter_unprocessed([]) == set()
+
+    db.load_processed_ids()
+    assert db.filter_unprocessed(ids) == {"2301.99999", "2301.88888"}
+
+def test_filter_unprocessed_many(db, saved_papers):
+    """Test long ID lists are checked in chunks under SQLite's parameter limit."""
+    ids = [f"2401.{i:05d}" for i in range(2500)] + ["2301.12345"]
+    with patch.object(db_module, "_MAX_VARIABLES", 100):
+        assert db.filter_unprocessed(ids) == set(ids[:-1])
@@ -0,0 +1,10 @@
+from src.http_session import make_session
+
+def test_make_session():
+    """Test both schemes share one pooled adapter."""
+    session = make_session(pool_maxsize=4, max_retries=2)
+
+    adapter = session.get_adapter("http://export.arxiv.org")
+    assert adapter is session.get_adapter("https://arxiv.org")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
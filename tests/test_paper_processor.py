@@ -4,11 +4,19 @@ from unittest.mock import MagicMock, patch
 from pathlib import Path
 
 from src.db import Database
-from src.paper_processor import PaperProcessor
+from src.paper_processor import STOPPED_EARLY, PaperProcessor, content_hash, is_complete
 
 @pytest.fixture
 def mock_db():
-    return MagicMock(spec=Database)
+    db = MagicMock(spec=Database)
+    db.get_cached_analysis.return_value = None
+    return db
+
+@pytest.fixture(autouse=True, scope="module")
+def fake_anthropic():
+    """Skip building real Anthropic clients; each processor still gets its own mock."""
+    with patch("src.paper_processor.Anthropic", side_effect=lambda **kwargs: MagicMock()):
+        yield
 
 @pytest.fixture
 def paper_processor(mock_db):
@@ -52,8 +60,172 @@ Potential applications for Etsy:
     assert "finding 1" in result["key_findings"].lower()
     assert "application 1" in result["etsy_applications"].lower()
     
-    # Verify Claude was called correctly
+    # Verify Claude was called correctly and the analysis was cached
+    mock_client.messages.create.assert_called_once()
+    cached = paper_processor.db.cache_analysis.call_args[0][1]
+    assert cached["relevance_score"] == 8 and "token_usage" not in cached
+
+    # The shared prompt prefix is marked for caching ahead of the paper text
+    kwargs = mock_client.messages.create.call_args.kwargs
+    assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+    task_block, paper_block = kwargs["messages"][0]["content"]
+    assert task_block["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in paper_block
+    assert "Test Paper" in paper_block["text"] and "Test abstract" in paper_block["text"]
+
+def test_assess_relevance_cache(paper_processor, mock_db):
+    """Test identical content reuses a stored analysis unless bypassed."""
+    mock_client = MagicMock()
+    paper_processor.anthropic = mock_client
+    mock_db.get_cached_analysis.return_value = {
+        "relevance_score": 6,
+        "summary": "Cached summary",
+        "key_findings": "Cached findings",
+        "etsy_applications": "Cached applications"
+    }
+
+    result = paper_processor.assess_relevance("Test Paper", "Test abstract")
+
+    assert result["summary"] == "Cached summary"
+    assert result["token_usage"] == 0
+    mock_client.messages.create.assert_not_called()
+
+    # A bypassed lookup calls Claude; a failed call is not cached
+    mock_client.messages.create.side_effect = Exception("API error")
+    result = paper_processor.assess_relevance("Test Paper", "Test abstract", use_cache=False)
+
+    assert result["relevance_score"] == 0
     mock_client.messages.create.assert_called_once()
+    mock_db.cache_analysis.assert_not_called()
+
+def test_assess_relevance_memory_cache(paper_processor, mock_db):
+    """Test repeats are served from memory without touching the database cache."""
+    paper_processor.anthropic = MagicMock()
+    paper_processor.anthropic.messages.create.side_effect = Exception("API error")
+    mock_db.get_cached_analysis.return_value = {
+        "relevance_score": 6,
+        "summary": "Cached summary",
+        "key_findings": "Cached findings",
+        "etsy_applications": "Cached applications"
+    }
+
+    first = paper_processor.assess_relevance("Test Paper", "Test abstract")
+    second = paper_processor.assess_relevance("Test Paper", "Test abstract")
+
+    assert first == second
+    mock_db.get_cached_analysis.assert_called_once()
+
+    with patch('src.paper_processor.MEMORY_CACHE_SIZE', 1):
+        paper_processor.assess_relevance("Other Paper", "Other abstract")
+    assert len(paper_processor._memory_cache) == 1
+
+def test_assess_relevance_stream_early_stop(paper_processor, mock_db):
+    """Test a streamed analysis stops once the score is below the threshold."""
+    paper_processor.min_relevance_score = 5
+    stream = MagicMock()
+    stream.text_stream = iter(["Relevance score: ", "3", "/10\n\n", "Executive summary: unread"])
+    stream.current_message_snapshot.usage = MagicMock(
+        input_tokens=100, output_tokens=5, cache_read_input_tokens=0
+    )
+    paper_processor.anthropic = MagicMock()
+    paper_processor.anthropic.messages.stream.return_value.__enter__.return_value = stream
+
+    result = paper_processor.assess_relevance("Test Paper", "Test abstract", stream=True)
+
+    assert result["relevance_score"] == 3
+    assert result["summary"] == STOPPED_EARLY
+    assert not is_complete(result)
+    # Output tokens are estimated from the 23 characters streamed
+    assert result["token_usage"] == 106
+    assert next(stream.text_stream) == "Executive summary: unread"
+    stream.get_final_message.assert_not_called()
+    paper_processor.anthropic.messages.create.assert_not_called()
+
+    # A truncated analysis is not reused for later requests
+    mock_db.cache_analysis.assert_not_called()
+
+def test_parse_response_score(paper_processor):
+    """Test the score is the number after the label, not every digit in the line."""
+    response = MagicMock()
+    response.content = [MagicMock(text=(
+        "1. Relevance score (1-10): 8/10\n\nExecutive summary: S\n\n"
+        "Key findings: F\n\nApplications: A"
+    ))]
+    assert paper_processor._parse_response(response)["relevance_score"] == 8
+
+def test_assess_relevance_rate_limited(mock_db):
+    """Test analysis calls wait on the configured requests-per-minute limit."""
+    processor = PaperProcessor(mock_db, "mock_api_key", requests_per_minute=30)
+    assert processor._limiter.interval == 2.0
+    processor._limiter = MagicMock()
+    processor.anthropic = MagicMock()
+
+    processor.assess_relevance("Test Paper", "Test abstract")
+
+    processor._limiter.acquire.assert_called_once()
+    processor.anthropic.messages.create.assert_called_once()
+
+def test_parse_sections():
+    """Test each field takes the first section with its marker, in one pass."""
+    sections = PaperProcessor._parse_sections(
+        "Relevance score: 8/10\n\nExecutive summary: A.\n\n"
+        "Key findings: B.\n\nPotential applications: C.\n\nMore applications: D."
+    )
+    assert sections["score"] == "Relevance score: 8/10"
+    assert sections["applications"] == "Potential applications: C."
+
+    with pytest.raises(ValueError):
+        PaperProcessor._parse_sections("Relevance score: 8/10")
+
+def test_content_hash():
+    """Test the cache key ignores case and whitespace but tracks the prompt."""
+    assert content_hash("A  Paper", "Some\nabstract") == content_hash("a paper", "some abstract ")
+    assert content_hash("A Paper", "Abstract", "v1") != content_hash("A Paper", "Abstract", "v2")
+
+@patch('time.sleep')
+def test_assess_relevance_batch(mock_sleep, paper_processor):
+    """Test batched analysis polls until done and matches results to papers."""
+    mock_client = MagicMock()
+    paper_processor.anthropic = mock_client
+    batches = mock_client.messages.batches
+    batches.create.return_value = MagicMock(id="batch_1", processing_status="in_progress")
+    batches.retrieve.return_value = MagicMock(id="batch_1", processing_status="ended")
+
+    message = MagicMock()
+    message.content = [MagicMock(text="""Relevance score: 7/10
+
+Executive summary: Batched summary.
+
+Key findings:
+- Finding
+
+Potential applications for Etsy:
+- Application""")]
+    message.usage.input_tokens = 100
+    message.usage.output_tokens = 50
+    message.usage.cache_read_input_tokens = 300
+    succeeded = MagicMock(custom_id="2301_12345")
+    succeeded.result.type = "succeeded"
+    succeeded.result.message = message
+    errored = MagicMock(custom_id="2301_12346")
+    errored.result.type = "errored"
+    batches.results.return_value = [succeeded, errored]
+
+    papers = [
+        {"arxiv_id": "2301.12345", "title": "Paper 1", "abstract": "Abstract 1"},
+        {"arxiv_id": "2301.12346", "title": "Paper 2", "abstract": "Abstract 2"}
+    ]
+    results = paper_processor.assess_relevance_batch(papers, poll_interval=1)
+
+    requests = batches.create.call_args.kwargs["requests"]
+    assert [r["custom_id"] for r in requests] == ["2301_12345", "2301_12346"]
+    assert "Paper 2" in requests[1]["params"]["messages"][0]["content"][1]["text"]
+    batches.retrieve.assert_called_once_with("batch_1")
+
+    assert results["2301.12345"]["relevance_score"] == 7
+    assert results["2301.12345"]["token_usage"] == 150
+    assert results["2301.12345"]["cache_read_tokens"] == 300
+    assert results["2301.12346"]["relevance_score"] == 0
 
 def test_process_paper(paper_processor, mock_db):
     """Test end-to-end paper processing."""
@@ -111,4 +283,43 @@ def test_process_existing_paper(paper_processor, mock_db):
         
         # Verify no processing was done
         mock_assess.assert_not_called()
-        mock_db.save_paper.assert_not_called() 
\ No newline at end of file
+        mock_db.save_paper.assert_not_called() 
+
+def test_submit_batch(paper_processor):
+    """Test a submitted batch is keyed by ArXiv ID when its results are read."""
+    paper_processor.anthropic = MagicMock()
+    batches = paper_processor.anthropic.messages.batches
+    batches.create.return_value = MagicMock(id="batch_1")
+
+    papers = [
+        {"arxiv_id": "2301.12345", "title": "Paper 1", "abstract": "Abstract 1"},
+        {"arxiv_id": "2301.12346", "title": "Paper 2", "abstract": "Abstract 2"}
+    ]
+    assert paper_processor.submit_batch(papers) == "batch_1"
+
+    results = []
+    for custom_id, score in (("2301_12345", 8), ("2301_12346", 3)):
+        result = MagicMock(custom_id=custom_id)
+        result.result.type = "succeeded"
+        result.result.message.content = [MagicMock(text=(
+            f"Relevance score: {score}/10\n\nExecutive summary: S\n\n"
+            "Key findings: F\n\nApplications: A"
+        ))]
+        result.result.message.usage = MagicMock(input_tokens=10, output_tokens=5, cache_read_input_tokens=0)
+        results.append(result)
+    batches.results.return_value = results
+
+    with patch('src.paper_processor.time.sleep') as mock_sleep:
+        batches.retrieve.side_effect = [
+            MagicMock(processing_status="in_progress"),
+            MagicMock(processing_status="in_progress"),
+            MagicMock(processing_status="ended")
+        ]
+        analyses = paper_processor.await_batch("batch_1", poll_interval=10)
+
+    # Polling backs off between checks
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [10, 20]
+    assert {arxiv_id: a["relevance_score"] for arxiv_id, a in analyses.items()} == {
+        "2301.12345": 8,
+        "2301.12346": 3
+    }
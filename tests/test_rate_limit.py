@@ -0,0 +1,19 @@
+from unittest.mock import patch
+
+from src.rate_limit import RateLimiter
+
+@patch("src.rate_limit.time.sleep")
+@patch("src.rate_limit.time.monotonic")
+def test_rate_limiter(mock_monotonic, mock_sleep):
+    """Test the limiter only waits when calls come too quickly."""
+    limiter = RateLimiter(3.0)
+    
+    # First call goes through immediately
+    mock_monotonic.return_value = 100.0
+    limiter.acquire()
+    mock_sleep.assert_not_called()
+    
+    # A call one second later waits for the remainder of the interval
+    mock_monotonic.return_value = 101.0
+    limiter.acquire()
+    mock_sleep.assert_called_once_with(2.0)
@@ -7,11 +7,17 @@ from src.rss_monitor import RSSMonitor
 
 @pytest.fixture
 def mock_db():
-    return MagicMock(spec=Database)
+    db = MagicMock(spec=Database)
+    db.get_feed_cache.return_value = None
+    return db
 
 @pytest.fixture
 def rss_monitor(mock_db):
-    return RSSMonitor(mock_db)
+    monitor = RSSMonitor(mock_db)
+    monitor.session = MagicMock()
+    # Not XML, so tests that patch feedparser.parse exercise the fallback parser
+    monitor.session.get.return_value.content = b""
+    return monitor
 
 def test_extract_arxiv_id():
     """Test ArXiv ID extraction from different URL formats."""
@@ -23,6 +29,12 @@ def test_extract_arxiv_id():
     # Test PDF URL
     assert monitor.extract_arxiv_id("https://arxiv.org/pdf/2301.12345.pdf") == "2301.12345"
     
+    # Test PDF URL without the .pdf suffix
+    assert monitor.extract_arxiv_id("https://arxiv.org/pdf/2301.12345v1") == "2301.12345"
+    
+    # Test versioned abstract URL
+    assert monitor.extract_arxiv_id("http://arxiv.org/abs/2301.12345v2") == "2301.12345"
+    
     # Test invalid URL
     assert monitor.extract_arxiv_id("https://example.com") is None
 
@@ -47,47 +59,200 @@ def test_parse_entry(rss_monitor):
     assert result['arxiv_url'] == 'https://arxiv.org/abs/2301.12345'
     assert result['published_date'] == '2024-01-01'
 
+def test_parse_entry_author_list(rss_monitor):
+    """Test a list of authors is joined by name."""
+    entry = {
+        'link': 'https://arxiv.org/abs/2301.12345',
+        'author': 'John Doe',
+        'authors': [{'name': 'John Doe'}, {'name': 'Jane Smith'}]
+    }
+
+    assert rss_monitor.parse_entry(entry)['authors'] == 'John Doe, Jane Smith'
+
+RSS_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <title>cs.IR updates on arXiv.org</title>
+    <item>
+      <title>Paper 1</title>
+      <link>https://arxiv.org/abs/2301.12345</link>
+      <description>Abstract 1</description>
+      <dc:creator>John Doe</dc:creator>
+      <pubDate>2024-01-01</pubDate>
+    </item>
+    <item>
+      <title>Paper 2</title>
+      <link>https://arxiv.org/abs/2301.12346</link>
+      <description>Abstract 2</description>
+      <dc:creator>Jane Smith</dc:creator>
+      <dc:creator>Carol Dan</dc:creator>
+      <pubDate>2024-01-02</pubDate>
+    </item>
+  </channel>
+</rss>"""
+
 @patch('feedparser.parse')
 def test_fetch_feed(mock_parse, rss_monitor, mock_db):
     """Test RSS feed fetching."""
-    # Mock feedparser response
-    mock_parse.return_value = MagicMock(
-        bozo=False,
-        entries=[
-            {
-                'title': 'Paper 1',
-                'link': 'https://arxiv.org/abs/2301.12345',
-                'author': 'John Doe',
-                'summary': 'Abstract 1',
-                'published': '2024-01-01'
-            },
-            {
-                'title': 'Paper 2',
-                'link': 'https://arxiv.org/abs/2301.12346',
-                'author': 'Jane Smith',
-                'summary': 'Abstract 2',
-                'published': '2024-01-02'
-            }
-        ]
-    )
+    rss_monitor.session.get.return_value.content = RSS_FEED
     
     # Mock database to say papers aren't processed
-    mock_db.is_paper_processed.return_value = False
+    mock_db.filter_unprocessed.return_value = {"2301.12345", "2301.12346"}
     
     # Test feed fetching
     feed_url = "http://export.arxiv.org/rss/cs.IR"
     results = rss_monitor.fetch_feed(feed_url)
+
+    # The feed is downloaded over the shared session and parsed incrementally
+    rss_monitor.session.get.assert_called_once_with(
+        feed_url, timeout=rss_monitor.request_timeout, headers={}
+    )
+    mock_parse.assert_not_called()
     
     assert len(results) == 2
     assert results[0]['arxiv_id'] == '2301.12345'
     assert results[1]['arxiv_id'] == '2301.12346'
+    assert results[0]['authors'] == 'John Doe'
+    assert results[1]['authors'] == 'Jane Smith, Carol Dan'
+    assert results[1]['abstract'] == 'Abstract 2'
     
-    # Verify database calls
+    # Verify database calls are batched per feed
     mock_db.update_feed_health.assert_called_once_with(feed_url, 2)
-    assert mock_db.is_paper_processed.call_count == 2
+    mock_db.filter_unprocessed.assert_called_once_with(["2301.12345", "2301.12346"])
+    conn = mock_db.transaction.return_value.__enter__.return_value
+    assert conn.executemany.call_args[0][1] == [
+        ("2301.12345", feed_url),
+        ("2301.12346", feed_url)
+    ]
 
 @patch('feedparser.parse')
-def test_fetch_feed_error(mock_parse, rss_monitor, mock_db):
+def test_fetch_feed_parses_only_unprocessed(mock_parse, rss_monitor, mock_db):
+    """Test processed and duplicate entries are skipped before parsing."""
+    mock_parse.return_value = MagicMock(
+        bozo=False,
+        entries=[
+            {'title': 'Old', 'link': 'https://arxiv.org/abs/2301.12345'},
+            {'title': 'New', 'link': 'https://arxiv.org/abs/2301.12346'},
+            {'title': 'New again', 'link': 'https://arxiv.org/abs/2301.12346'},
+            {'title': 'No ID', 'link': 'https://example.com'}
+        ]
+    )
+    mock_db.filter_unprocessed.return_value = {"2301.12346"}
+    rss_monitor.parse_entry = MagicMock(wraps=rss_monitor.parse_entry)
+
+    results = rss_monitor.fetch_feed("http://export.arxiv.org/rss/cs.IR")
+
+    assert [r['title'] for r in results] == ['New']
+    rss_monitor.parse_entry.assert_called_once()
+    mock_db.filter_unprocessed.assert_called_once_with(["2301.12345", "2301.12346", "2301.12346"])
+    # The already-processed paper is still mapped to this feed
+    conn = mock_db.transaction.return_value.__enter__.return_value
+    assert conn.executemany.call_args[0][1] == [
+        ("2301.12345", "http://export.arxiv.org/rss/cs.IR"),
+        ("2301.12346", "http://export.arxiv.org/rss/cs.IR")
+    ]
+
+def test_fetch_feed_maps_paper_saved_from_other_feed(tmp_path):
+    """Test a feed finishing after a cross-listed paper was saved still maps it."""
+    db = Database(os.path.join(tmp_path, "test.db"))
+    monitor = RSSMonitor(db)
+    monitor.session = MagicMock()
+    monitor.session.get.return_value.content = RSS_FEED
+    monitor.session.get.return_value.headers = {}
+
+    first_feed = "http://export.arxiv.org/rss/cs.IR"
+    second_feed = "http://export.arxiv.org/rss/cs.LG"
+    for paper in monitor.fetch_feed(first_feed):
+        db.save_paper(paper)
+
+    assert monitor.fetch_feed(second_feed) == []
+    with db.transaction() as conn:
+        rows = conn.execute(
+            "SELECT arxiv_id, feed_url FROM feed_paper_mapping ORDER BY feed_url, arxiv_id"
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("2301.12345", first_feed),
+        ("2301.12346", first_feed),
+        ("2301.12345", second_feed),
+        ("2301.12346", second_feed)
+    ]
+
+def test_monitor_feeds_cross_listed(rss_monitor):
+    """Test a paper listed in several feeds is returned once."""
+    feeds = {
+        "http://export.arxiv.org/rss/cs.IR": [{"arxiv_id": "1"}, {"arxiv_id": "2"}],
+        "http://export.arxiv.org/rss/cs.LG": [{"arxiv_id": "2"}, {"arxiv_id": "3"}]
+    }
+    rss_monitor.fetch_feed = MagicMock(side_effect=feeds.get)
+
+    results = rss_monitor.monitor_feeds(list(feeds))
+
+    assert [p["arxiv_id"] for p in results] == ["1", "2", "3"]
+
+def test_iter_new_entries(rss_monitor):
+    """Test each feed's papers are yielded as it completes, cross-listings once."""
+    feeds = {
+        "http://export.arxiv.org/rss/cs.IR": [{"arxiv_id": "1"}, {"arxiv_id": "2"}],
+        "http://export.arxiv.org/rss/cs.LG": [{"arxiv_id": "2"}, {"arxiv_id": "3"}]
+    }
+    rss_monitor.fetch_feed = MagicMock(side_effect=feeds.get)
+
+    batches = list(rss_monitor.iter_new_entries(list(feeds)))
+
+    assert len(batches) == 2
+    assert sorted(p["arxiv_id"] for batch in batches for p in batch) == ["1", "2", "3"]
+
+@patch('feedparser.parse')
+def test_fetch_feed_not_modified(mock_parse, rss_monitor, mock_db):
+    """Test a feed unchanged since its last download is not parsed again."""
+    feed_url = "http://export.arxiv.org/rss/cs.IR"
+    mock_db.get_feed_cache.return_value = {
+        "etag": '"abc"',
+        "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+        "entry_count": 25
+    }
+    rss_monitor.session.get.return_value.status_code = 304
+
+    assert rss_monitor.fetch_feed(feed_url) == []
+
+    rss_monitor.session.get.assert_called_once_with(
+        feed_url,
+        timeout=rss_monitor.request_timeout,
+        headers={"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    )
+    mock_parse.assert_not_called()
+    mock_db.filter_unprocessed.assert_not_called()
+    mock_db.update_feed_health.assert_called_once_with(feed_url, 25)
+
+def test_fetch_feed_validators_wait_for_processing(tmp_path):
+    """Test a feed whose papers failed to process is not answered with a 304 next poll."""
+    db = Database(os.path.join(tmp_path, "test.db"))
+    monitor = RSSMonitor(db)
+    feed_url = "http://export.arxiv.org/rss/cs.IR"
+
+    def get(url, timeout, headers):
+        # The feed is unchanged, so any conditional request is answered with a 304
+        response = MagicMock(headers={"ETag": '"abc"'}, content=RSS_FEED)
+        response.status_code = 304 if headers else 200
+        return response
+    monitor.session = MagicMock()
+    monitor.session.get.side_effect = get
+
+    assert len(monitor.fetch_feed(feed_url)) == 2
+    monitor.save_validators(failed_feeds=[feed_url])
+    assert db.get_feed_cache(feed_url)["etag"] is None
+
+    # Processing failed, so the papers are downloaded and offered again
+    assert len(monitor.fetch_feed(feed_url)) == 2
+    assert monitor.session.get.call_args.kwargs["headers"] == {}
+
+    monitor.save_validators()
+    assert monitor.fetch_feed(feed_url) == []
+    assert monitor.session.get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+@patch('src.rss_monitor.time.sleep')
+@patch('feedparser.parse')
+def test_fetch_feed_error(mock_parse, mock_sleep, rss_monitor, mock_db):
     """Test RSS feed error handling."""
     # Mock feedparser error
     mock_parse.return_value = MagicMock(
@@ -101,6 +266,29 @@ def test_fetch_feed_error(mock_parse, rss_monitor, mock_db):
     assert len(results) == 0
     mock_db.update_feed_health.assert_called_once_with(feed_url, 0)
 
+    # Every attempt is made, with a growing jittered backoff between them
+    assert rss_monitor.session.get.call_count == rss_monitor.max_retries + 1
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == rss_monitor.max_retries
+    for attempt, delay in enumerate(delays):
+        base = rss_monitor.base_delay * 2 ** attempt
+        assert 0.5 * base <= delay <= 1.5 * base
+
+@patch('src.rss_monitor.random.random', return_value=0.5)
+@patch('src.rss_monitor.time.sleep')
+@patch('feedparser.parse')
+def test_fetch_feed_with_retry_recovers(mock_parse, mock_sleep, mock_random, rss_monitor):
+    """Test a failed fetch is retried after a jittered backoff."""
+    mock_parse.return_value = MagicMock(bozo=False, entries=[])
+    response = MagicMock(status_code=200, headers={}, content=b"")
+    rss_monitor.session.get.side_effect = [Exception("Connection reset"), response]
+
+    feed = rss_monitor.fetch_feed_with_retry("http://export.arxiv.org/rss/cs.IR")
+
+    assert feed is mock_parse.return_value
+    assert rss_monitor.session.get.call_count == 2
+    mock_sleep.assert_called_once_with(rss_monitor.base_delay * 1.0)
+
 def test_check_feed_health(rss_monitor, mock_db):
     """Test feed health checking."""
     feed_url = "http://export.arxiv.org/rss/cs.IR"
@@ -127,4 +315,29 @@ def test_check_feed_health(rss_monitor, mock_db):
     mock_db.get_feed_health.return_value = None
     
     health = rss_monitor.check_feed_health(feed_url)
-    assert health["status"] == "unknown" 
\ No newline at end of file
+    assert health["status"] == "unknown"
+
+@patch('time.sleep')
+def test_monitor_feeds(mock_sleep, rss_monitor):
+    """Test feeds are fetched concurrently and combined in feed order."""
+    feeds = {
+        "http://export.arxiv.org/rss/cs.IR": [{"arxiv_id": "1"}],
+        "http://export.arxiv.org/rss/cs.LG": [{"arxiv_id": "2"}, {"arxiv_id": "3"}],
+        "http://export.arxiv.org/rss/cs.AI": Exception("Feed down")
+    }
+
+    def fetch_feed(feed_url):
+        result = feeds[feed_url]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    rss_monitor.fetch_feed = MagicMock(side_effect=fetch_feed)
+
+    results = rss_monitor.monitor_feeds(list(feeds))
+
+    assert [p["arxiv_id"] for p in results] == ["1", "2", "3"]
+    assert rss_monitor.fetch_feed.call_count == 3
+
+    # Politeness comes from bounded concurrency, not sleeping between feeds
+    mock_sleep.assert_not_called()